@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import numpy as np
+
+from _vec3 import njit
+
+# Indexed binary min-heap: `pos[v]` is v's slot in the heap, -1 if v was never
+# queued and -2 once it has been popped (settled).
+_UNSEEN = -1
+_SETTLED = -2
+
+# Explicit signatures compile the kernels eagerly at import and load them from the
+# on-disk cache afterwards, like the _vec3 helpers. CSR arrays are int32, the
+# edge-length graph weights float64 and the anisotropic weights float32.
+_ISO_SIGNATURE = (
+    "Tuple((float64[::1], int32[::1]))(int32[::1], int32[::1], float64[::1], int64, int64[::1], boolean[::1])"
+)
+_ANISO_STEP_SIGNATURE = (
+    "Tuple((int64, float64, int64, int64))(int32[::1], int32[::1], float64[:, ::1], float32[::1], "
+    "float64[::1], float64[::1], float64[::1], int32[::1], int32[::1], int64, float64[::1], int32[::1], "
+    "float64[::1], float64, int64, int64)"
+)
+_ANISO_SIGNATURE = (
+    "Tuple((int32[::1], int32[::1], int64, int64))(int32[::1], int32[::1], float64[:, ::1], float32[::1], int64, int64)"
+)
+# fastmath without "ninf"/"nnan": the kernels start every distance at inf and
+# compare against it to tell unreached vertices and the unset bound mu apart.
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@njit("boolean(float64[::1], int32[::1], int64, int64)", cache=True, nogil=True)
+def _heap_less(keys: np.ndarray, nodes: np.ndarray, a: int, b: int) -> bool:
+    return keys[a] < keys[b] or (keys[a] == keys[b] and nodes[a] < nodes[b])
+
+
+@njit("void(float64[::1], int32[::1], int32[::1], int64, int64)", cache=True, nogil=True)
+def _heap_swap(keys: np.ndarray, nodes: np.ndarray, pos: np.ndarray, a: int, b: int) -> None:
+    keys[a], keys[b] = keys[b], keys[a]
+    nodes[a], nodes[b] = nodes[b], nodes[a]
+    pos[nodes[a]] = a
+    pos[nodes[b]] = b
+
+
+@njit("void(float64[::1], int32[::1], int32[::1], int64)", cache=True, nogil=True)
+def _heap_sift_up(keys: np.ndarray, nodes: np.ndarray, pos: np.ndarray, i: int) -> None:
+    while i > 0:
+        parent = (i - 1) >> 1
+        if not _heap_less(keys, nodes, i, parent):
+            break
+        _heap_swap(keys, nodes, pos, i, parent)
+        i = parent
+
+
+@njit("int64(float64[::1], int32[::1], int32[::1], int64, float64, int64)", cache=True, nogil=True)
+def _heap_push_or_decrease(
+    keys: np.ndarray, nodes: np.ndarray, pos: np.ndarray, size: int, key: float, node: int
+) -> int:
+    i = pos[node]
+    if i < 0:
+        i = size
+        nodes[i] = node
+        pos[node] = i
+        size += 1
+    keys[i] = key
+    _heap_sift_up(keys, nodes, pos, i)
+    return size
+
+
+@njit("int64(float64[::1], int32[::1], int32[::1], int64)", cache=True, nogil=True)
+def _heap_pop(keys: np.ndarray, nodes: np.ndarray, pos: np.ndarray, size: int) -> int:
+    pos[nodes[0]] = _SETTLED
+    size -= 1
+    if size == 0:
+        return size
+    keys[0] = keys[size]
+    nodes[0] = nodes[size]
+    pos[nodes[0]] = 0
+    i = 0
+    while True:
+        left = 2 * i + 1
+        if left >= size:
+            break
+        child = left
+        if left + 1 < size and _heap_less(keys, nodes, left + 1, left):
+            child = left + 1
+        if not _heap_less(keys, nodes, child, i):
+            break
+        _heap_swap(keys, nodes, pos, i, child)
+        i = child
+    return size
+
+
+@njit("Tuple((boolean[::1], int64))(int64, int64[::1])", cache=True, nogil=True)
+def _mark_targets(num_points: int, targets: np.ndarray) -> tuple[np.ndarray, int]:
+    is_target = np.zeros(num_points, dtype=np.bool_)
+    remaining = 0
+    for target in targets:
+        if not is_target[target]:
+            is_target[target] = True
+            remaining += 1
+    return is_target, remaining
+
+
+@njit(_ISO_SIGNATURE, cache=True, nogil=True, fastmath=_FASTMATH)
+def iso_dijkstra(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    weights: np.ndarray,
+    start: int,
+    targets: np.ndarray,
+    allowed: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    # One search from `start` over precomputed edge weights that stops as soon as
+    # every id in `targets` has been settled; with no targets it runs to
+    # completion. Vertices with a False `allowed` entry are never entered.
+    num_points = indptr.shape[0] - 1
+    dist = np.full(num_points, np.inf)
+    prev = np.full(num_points, -1, dtype=np.int32)
+    pos = np.full(num_points, _UNSEEN, dtype=np.int32)
+    heap_keys = np.empty(num_points, dtype=np.float64)
+    heap_nodes = np.empty(num_points, dtype=np.int32)
+    is_target, remaining = _mark_targets(num_points, targets)
+
+    dist[start] = 0.0
+    size = _heap_push_or_decrease(heap_keys, heap_nodes, pos, 0, 0.0, start)
+    while size > 0:
+        current_dist = heap_keys[0]
+        current = heap_nodes[0]
+        size = _heap_pop(heap_keys, heap_nodes, pos, size)
+        if is_target[current]:
+            remaining -= 1
+            if remaining == 0:
+                break
+        for k in range(indptr[current], indptr[current + 1]):
+            neighbor = indices[k]
+            if pos[neighbor] == _SETTLED or not allowed[neighbor]:
+                continue
+            next_dist = current_dist + weights[k]
+            if next_dist < dist[neighbor]:
+                dist[neighbor] = next_dist
+                prev[neighbor] = current
+                size = _heap_push_or_decrease(heap_keys, heap_nodes, pos, size, next_dist, neighbor)
+    return dist, prev
+
+
+@njit("float64(float64[:, ::1], int64, float64[::1], float64[::1])", cache=True, nogil=True, fastmath=_FASTMATH)
+def _potential(xyz: np.ndarray, v: int, source: np.ndarray, target: np.ndarray) -> float:
+    # Average potential (h_target - h_source) / 2 with Euclidean h, which never
+    # exceeds the anisotropic cost because every edge weighs at least its length.
+    ax = xyz[v, 0] - source[0]
+    ay = xyz[v, 1] - source[1]
+    az = xyz[v, 2] - source[2]
+    bx = xyz[v, 0] - target[0]
+    by = xyz[v, 1] - target[1]
+    bz = xyz[v, 2] - target[2]
+    return 0.5 * (np.sqrt(bx * bx + by * by + bz * bz) - np.sqrt(ax * ax + ay * ay + az * az))
+
+
+@njit(_ANISO_STEP_SIGNATURE, cache=True, nogil=True, fastmath=_FASTMATH)
+def _aniso_step(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    xyz: np.ndarray,
+    weights: np.ndarray,
+    source: np.ndarray,
+    target: np.ndarray,
+    heap_keys: np.ndarray,
+    heap_nodes: np.ndarray,
+    pos: np.ndarray,
+    size: int,
+    dist: np.ndarray,
+    prev: np.ndarray,
+    other_dist: np.ndarray,
+    mu: float,
+    meet_here: int,
+    meet_other: int,
+) -> tuple[int, float, int, int]:
+    current = heap_nodes[0]
+    current_dist = dist[current]
+    size = _heap_pop(heap_keys, heap_nodes, pos, size)
+    for k in range(indptr[current], indptr[current + 1]):
+        neighbor = indices[k]
+        if pos[neighbor] == _SETTLED:
+            continue
+        next_dist = current_dist + weights[k]
+        if next_dist + other_dist[neighbor] < mu:
+            mu = next_dist + other_dist[neighbor]
+            meet_here = current
+            meet_other = neighbor
+        if next_dist < dist[neighbor]:
+            dist[neighbor] = next_dist
+            prev[neighbor] = current
+            key = next_dist + _potential(xyz, neighbor, source, target)
+            size = _heap_push_or_decrease(heap_keys, heap_nodes, pos, size, key, neighbor)
+    return size, mu, meet_here, meet_other
+
+
+@njit(_ANISO_SIGNATURE, cache=True, nogil=True, fastmath=_FASTMATH)
+def aniso_bidirectional_dijkstra(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    xyz: np.ndarray,
+    weights: np.ndarray,
+    start: int,
+    end: int,
+) -> tuple[np.ndarray, np.ndarray, int, int]:
+    # Bidirectional A*: the anisotropic weights are symmetric, so the backward
+    # search from `end` uses the same edge weights, and the two searches use opposite
+    # average potentials so their keys add up to a valid bound on mu. Returns both
+    # predecessor arrays and the meeting edge (forward_id, backward_id); both are
+    # -1 when `end` is unreachable.
+    num_points = indptr.shape[0] - 1
+    dist_f = np.full(num_points, np.inf)
+    dist_b = np.full(num_points, np.inf)
+    prev_f = np.full(num_points, -1, dtype=np.int32)
+    prev_b = np.full(num_points, -1, dtype=np.int32)
+    pos_f = np.full(num_points, _UNSEEN, dtype=np.int32)
+    pos_b = np.full(num_points, _UNSEEN, dtype=np.int32)
+    keys_f = np.empty(num_points, dtype=np.float64)
+    nodes_f = np.empty(num_points, dtype=np.int32)
+    keys_b = np.empty(num_points, dtype=np.float64)
+    nodes_b = np.empty(num_points, dtype=np.int32)
+    start_xyz = xyz[start].astype(np.float64)
+    end_xyz = xyz[end].astype(np.float64)
+
+    dist_f[start] = 0.0
+    dist_b[end] = 0.0
+    size_f = _heap_push_or_decrease(keys_f, nodes_f, pos_f, 0, _potential(xyz, start, start_xyz, end_xyz), start)
+    size_b = _heap_push_or_decrease(keys_b, nodes_b, pos_b, 0, _potential(xyz, end, end_xyz, start_xyz), end)
+    mu = np.inf
+    meet_f = -1
+    meet_b = -1
+    while size_f > 0 and size_b > 0:
+        if keys_f[0] + keys_b[0] >= mu:
+            break
+        if size_f <= size_b:
+            size_f, mu, meet_f, meet_b = _aniso_step(
+                indptr, indices, xyz, weights, start_xyz, end_xyz,
+                keys_f, nodes_f, pos_f, size_f, dist_f, prev_f, dist_b, mu, meet_f, meet_b,
+            )
+        else:
+            size_b, mu, meet_b, meet_f = _aniso_step(
+                indptr, indices, xyz, weights, end_xyz, start_xyz,
+                keys_b, nodes_b, pos_b, size_b, dist_b, prev_b, dist_f, mu, meet_b, meet_f,
+            )
+    return prev_f, prev_b, meet_f, meet_b
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
+
+# A mesh read once is mirrored into a per-user cache directory as raw .npy arrays
+# (nothing is written next to the data): points, the polygon offsets/connectivity
+# and the active point scalars and normals. Later loads memory-map them
+# copy-on-write, so VTK wraps the pages without parsing or copying and nothing
+# written through VTK reaches the cache files. The Morton order the landmark
+# resolver sorts its points by is kept alongside.
+
+_MAX_ENTRIES = 8
+
+
+def _cache_root() -> Path:
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "segmenter" / "meshes"
+
+
+def _entry_dir(path: Path) -> Path | None:
+    # One entry per resolved path and (size, mtime, ctime): another file copied over
+    # the path with its old mtime preserved still gets a new ctime.
+    try:
+        resolved = path.resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    key = f"{resolved}\0{stat.st_size}\0{stat.st_mtime_ns}\0{stat.st_ctime_ns}"
+    return _cache_root() / hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _prune(keep: Path) -> None:
+    # Only the most recently used entries survive; load touches its entry.
+    try:
+        entries = sorted(
+            (item for item in _cache_root().iterdir() if item.is_dir() and item != keep),
+            key=lambda item: item.stat().st_mtime_ns,
+            reverse=True,
+        )
+    except OSError:
+        return
+    for item in entries[_MAX_ENTRIES - 1 :]:
+        shutil.rmtree(item, ignore_errors=True)
+
+
+def load(path: Path) -> vtkPolyData | None:
+    entry = _entry_dir(path)
+    if entry is None:
+        return None
+    mesh = entry / "mesh"
+    try:
+        names = (mesh / "names.txt").read_text(encoding="utf-8").split("\n")
+        arrays = {
+            item.stem: np.load(item, mmap_mode="c", allow_pickle=False)
+            for item in mesh.glob("*.npy")
+        }
+        os.utime(entry)
+    except (OSError, ValueError):
+        return None
+    if not {"points", "offsets", "connectivity"}.issubset(arrays):
+        return None
+
+    points = vtkPoints()
+    points.SetData(numpy_to_vtk(arrays["points"], deep=0))
+    polys = vtkCellArray()
+    polys.SetData(
+        numpy_to_vtkIdTypeArray(arrays["offsets"], deep=0),
+        numpy_to_vtkIdTypeArray(arrays["connectivity"], deep=0),
+    )
+    polydata = vtkPolyData()
+    polydata.SetPoints(points)
+    polydata.SetPolys(polys)
+
+    point_data = polydata.GetPointData()
+    for attribute, name in zip(("scalars", "normals"), names):
+        if attribute not in arrays:
+            continue
+        array = numpy_to_vtk(arrays[attribute], deep=0)
+        array.SetName(name)
+        if attribute == "scalars":
+            point_data.SetScalars(array)
+        else:
+            point_data.SetNormals(array)
+    return polydata
+
+
+def store(path: Path, polydata: vtkPolyData) -> None:
+    # Only plain triangle/polygon meshes whose data is at most the active point
+    # scalars and normals are mirrored; anything else keeps going through the VTK
+    # reader, so a cached load never returns less than the reader does.
+    if polydata.GetNumberOfVerts() or polydata.GetNumberOfLines() or polydata.GetNumberOfStrips():
+        return
+    point_data = polydata.GetPointData()
+    attributes = (("scalars", point_data.GetScalars()), ("normals", point_data.GetNormals()))
+    if point_data.GetNumberOfArrays() != sum(array is not None for _, array in attributes):
+        return
+    if polydata.GetCellData().GetNumberOfArrays() or polydata.GetFieldData().GetNumberOfArrays():
+        return
+    entry = _entry_dir(path)
+    if entry is None or (entry / "mesh").is_dir():
+        return
+    polys = polydata.GetPolys()
+    arrays = {
+        "points": vtk_to_numpy(polydata.GetPoints().GetData()),
+        "offsets": vtk_to_numpy(polys.GetOffsetsArray()).astype(np.int64, copy=False),
+        "connectivity": vtk_to_numpy(polys.GetConnectivityArray()).astype(np.int64, copy=False),
+    }
+    names = []
+    for attribute, array in attributes:
+        if array is None:
+            names.append("")
+            continue
+        names.append(array.GetName() or "")
+        arrays[attribute] = vtk_to_numpy(array)
+
+    # Written into a staging directory and renamed into place in one step, so a
+    # concurrent load sees either no mesh or a complete one.
+    staging = None
+    try:
+        entry.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=entry))
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        (staging / "names.txt").write_text("\n".join(names), encoding="utf-8")
+        staging.rename(entry / "mesh")
+    except OSError:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        return
+    _prune(entry)
+
+
+def load_order(path: Path) -> np.ndarray | None:
+    entry = _entry_dir(path)
+    if entry is None:
+        return None
+    try:
+        return np.load(entry / "order.npy", allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+
+
+def store_order(path: Path, order: np.ndarray) -> None:
+    entry = _entry_dir(path)
+    if entry is None or (entry / "order.npy").is_file():
+        return
+    try:
+        entry.mkdir(parents=True, exist_ok=True)
+        handle, staging = tempfile.mkstemp(suffix=".npy", dir=entry)
+        with os.fdopen(handle, "wb") as file:
+            np.save(file, order, allow_pickle=False)
+        os.replace(staging, entry / "order.npy")
+    except OSError:
+        return
+    _prune(entry)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import numpy as np
+from numba import njit
+
+# Explicit signatures compile eagerly at import and, with cache=True, are loaded
+# from the on-disk cache on later runs, so no call pays JIT warm-up.
+
+
+@njit("float64(float64[::1], float64[::1])", cache=True, fastmath=True)
+def dot(a: np.ndarray, b: np.ndarray) -> float:
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+@njit("float64[::1](float64[::1], float64[::1], float64[::1])", cache=True, fastmath=True)
+def add(a: np.ndarray, b: np.ndarray, out: np.ndarray) -> np.ndarray:
+    out[0] = a[0] + b[0]
+    out[1] = a[1] + b[1]
+    out[2] = a[2] + b[2]
+    return out
+
+
+@njit("float64[::1](float64[::1], float64[::1], float64[::1])", cache=True, fastmath=True)
+def sub(a: np.ndarray, b: np.ndarray, out: np.ndarray) -> np.ndarray:
+    out[0] = a[0] - b[0]
+    out[1] = a[1] - b[1]
+    out[2] = a[2] - b[2]
+    return out
+
+
+@njit("float64[::1](float64[::1], float64, float64[::1])", cache=True, fastmath=True)
+def scale(a: np.ndarray, s: float, out: np.ndarray) -> np.ndarray:
+    out[0] = a[0] * s
+    out[1] = a[1] * s
+    out[2] = a[2] * s
+    return out
+
+
+@njit("float64[::1](float64[::1], float64[::1], float64[::1])", cache=True, fastmath=True)
+def cross(a: np.ndarray, b: np.ndarray, out: np.ndarray) -> np.ndarray:
+    x = a[1] * b[2] - a[2] * b[1]
+    y = a[2] * b[0] - a[0] * b[2]
+    z = a[0] * b[1] - a[1] * b[0]
+    out[0] = x
+    out[1] = y
+    out[2] = z
+    return out
+
+
+@njit("float64[::1](float64[::1], float64[::1])", cache=True, fastmath=True)
+def normalize(vec: np.ndarray, out: np.ndarray) -> np.ndarray:
+    mag = (vec[0] * vec[0] + vec[1] * vec[1] + vec[2] * vec[2]) ** 0.5
+    if mag == 0.0:
+        out[0] = 0.0
+        out[1] = 0.0
+        out[2] = 0.0
+        return out
+    out[0] = vec[0] / mag
+    out[1] = vec[1] / mag
+    out[2] = vec[2] / mag
+    return out
+
+
+@njit("float64[::1](float64[::1], float64[::1], float64[::1], float64[::1])", cache=True, fastmath=True)
+def plane_normal(a: np.ndarray, b: np.ndarray, c: np.ndarray, out: np.ndarray) -> np.ndarray:
+    abx = b[0] - a[0]
+    aby = b[1] - a[1]
+    abz = b[2] - a[2]
+    acx = c[0] - a[0]
+    acy = c[1] - a[1]
+    acz = c[2] - a[2]
+    out[0] = aby * acz - abz * acy
+    out[1] = abz * acx - abx * acz
+    out[2] = abx * acy - aby * acx
+    return out
+
+
+@njit("float64[::1](float64[::1], float64[::1], float64[::1], float64[::1])", cache=True, fastmath=True)
+def plane_normal_unit(a: np.ndarray, b: np.ndarray, c: np.ndarray, out: np.ndarray) -> np.ndarray:
+    abx = b[0] - a[0]
+    aby = b[1] - a[1]
+    abz = b[2] - a[2]
+    acx = c[0] - a[0]
+    acy = c[1] - a[1]
+    acz = c[2] - a[2]
+    nx = aby * acz - abz * acy
+    ny = abz * acx - abx * acz
+    nz = abx * acy - aby * acx
+    mag = (nx * nx + ny * ny + nz * nz) ** 0.5
+    if mag == 0.0:
+        out[0] = 0.0
+        out[1] = 0.0
+        out[2] = 0.0
+        return out
+    inv = 1.0 / mag
+    out[0] = nx * inv
+    out[1] = ny * inv
+    out[2] = nz * inv
+    return out
+
+
+@njit("int64(float64[::1], float64[::1], float64[::1])", cache=True, fastmath=True)
+def plane_side(plane_point: np.ndarray, normal: np.ndarray, point: np.ndarray) -> int:
+    value = (
+        normal[0] * (point[0] - plane_point[0])
+        + normal[1] * (point[1] - plane_point[1])
+        + normal[2] * (point[2] - plane_point[2])
+    )
+    return 1 if value >= 0 else -1
+
+
+@njit(
+    [
+        "int64(float32[:, ::1], float64[::1])",
+        "int64(float64[:, ::1], float64[::1])",
+    ],
+    cache=True,
+)
+def nearest_point_index(points: np.ndarray, target: np.ndarray) -> int:
+    # First index of the minimum squared distance, -1 for no points.
+    best = -1
+    best_dist_sq = np.inf
+    for i in range(points.shape[0]):
+        dx = points[i, 0] - target[0]
+        dy = points[i, 1] - target[1]
+        dz = points[i, 2] - target[2]
+        dist_sq = dx * dx + dy * dy + dz * dz
+        if dist_sq < best_dist_sq:
+            best_dist_sq = dist_sq
+            best = i
+    return best
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-import heapq
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from typing import Iterable, Sequence
 
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.sparse import csr_matrix
+from vtkmodules.util.numpy_support import numpy_to_vtk, numpy_to_vtkIdTypeArray, vtk_to_numpy
 from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPointLocator, vtkPolyData
-from vtkmodules.vtkCommonCore import vtkFloatArray, vtkIdList, vtkPoints
-from vtkmodules.vtkFiltersCore import vtkAppendPolyData
-from vtkmodules.vtkFiltersModeling import vtkDijkstraGraphGeodesicPath
-from vtkmodules.vtkFiltersCore import vtkClipPolyData
-from vtkmodules.vtkCommonDataModel import vtkPlane
+from vtkmodules.vtkCommonCore import vtkPoints
+
+import _vec3
+from _dijkstra import aniso_bidirectional_dijkstra, iso_dijkstra
 
 
 @dataclass(frozen=True)
@@ -18,11 +22,65 @@ class GeodesicResult:
     polyline: vtkPolyData
 
 
+def _geometry_mtime(surface: vtkPolyData) -> int:
+    # Point-data edits (e.g. SegmentId scalars) bump the polydata's own MTime, so
+    # only the points and polygons are consulted.
+    stamps = [surface.GetPolys().GetMTime()]
+    points = surface.GetPoints()
+    if points is not None:
+        stamps.append(points.GetMTime())
+        stamps.append(points.GetData().GetMTime())
+    return max(stamps)
+
+
+# Serialises attaching and releasing caches: the main window builds the resolver on a
+# pool thread while the GUI thread may compute regions on the same surface.
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class GeoCache:
+    mtime: int
+    coords: np.ndarray
+    locator: vtkPointLocator | None = None
+    graph: csr_matrix | None = None
+    adjacency: tuple[np.ndarray, np.ndarray] | None = None
+    edge_vectors: tuple[np.ndarray, np.ndarray] | None = None
+    aniso_weights: tuple[tuple[float, float, float, float], np.ndarray] | None = None
+    resolver: LandmarkResolver | None = None
+
+    @classmethod
+    def get_or_build(cls, surface: vtkPolyData) -> GeoCache:
+        with _cache_lock:
+            mtime = _geometry_mtime(surface)
+            cache = getattr(surface, "_geo_cache", None)
+            if cache is None or cache.mtime != mtime:
+                points = surface.GetPoints()
+                coords = (
+                    vtk_to_numpy(points.GetData()).reshape(-1, 3).astype(np.float64)
+                    if points is not None
+                    else np.zeros((0, 3), dtype=np.float64)
+                )
+                cache = cls(mtime=mtime, coords=coords)
+                surface._geo_cache = cache
+            return cache
+
+
+def release_geo_cache(surface: vtkPolyData) -> None:
+    # Drops everything cached for the surface; it is rebuilt on next use.
+    with _cache_lock:
+        surface._geo_cache = None
+
+
 def build_point_locator(surface: vtkPolyData) -> vtkPointLocator:
-    locator = vtkPointLocator()
-    locator.SetDataSet(surface)
-    locator.BuildLocator()
-    return locator
+    cache = GeoCache.get_or_build(surface)
+    if cache.locator is None:
+        # Closest-point queries go through the landmark resolver; the octree is only
+        # built if something calls FindClosestPoint on this locator directly.
+        locator = vtkPointLocator()
+        locator.SetDataSet(surface)
+        cache.locator = locator
+    return cache.locator
 
 
 def closest_point_id(locator: vtkPointLocator, point: Iterable[float]) -> int:
@@ -30,46 +88,280 @@ def closest_point_id(locator: vtkPointLocator, point: Iterable[float]) -> int:
     return int(locator.FindClosestPoint(x, y, z))
 
 
-def compute_geodesic(surface: vtkPolyData, start_id: int, end_id: int) -> GeodesicResult:
-    dijkstra = vtkDijkstraGraphGeodesicPath()
-    dijkstra.SetInputData(surface)
-    dijkstra.SetStartVertex(start_id)
-    dijkstra.SetEndVertex(end_id)
-    dijkstra.Update()
-
-    polyline = dijkstra.GetOutput()
-    point_ids = [int(dijkstra.GetIdList().GetId(i)) for i in range(dijkstra.GetIdList().GetNumberOfIds())]
-    return GeodesicResult(point_ids=point_ids, polyline=polyline)
-
-
-def _build_point_adjacency(surface: vtkPolyData) -> list[set[int]]:
-    adjacency: list[set[int]] = [set() for _ in range(surface.GetNumberOfPoints())]
-
-    def add_cell(ids: Iterable[int]) -> None:
-        ids_list = list(ids)
-        count = len(ids_list)
-        for i in range(count):
-            a = ids_list[i]
-            for j in range(i + 1, count):
-                b = ids_list[j]
-                adjacency[a].add(b)
-                adjacency[b].add(a)
+def _spread_bits(values: np.ndarray) -> np.ndarray:
+    v = values.astype(np.uint64) & np.uint64(0x1FFFFF)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def morton_order(coords: np.ndarray) -> np.ndarray:
+    if coords.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    low = coords.min(axis=0)
+    extent = coords.max(axis=0) - low
+    extent[extent == 0] = 1.0
+    quantized = ((coords - low) / extent * 0x1FFFFF).astype(np.uint64)
+    codes = (
+        _spread_bits(quantized[:, 0])
+        | (_spread_bits(quantized[:, 1]) << np.uint64(1))
+        | (_spread_bits(quantized[:, 2]) << np.uint64(2))
+    )
+    return np.argsort(codes, kind="stable")
 
+
+# Landmark positions repeat across pairs, but every distinct pick adds a key, so the
+# memo keeps only the most recently used ones.
+_MEMO_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class LandmarkResolver:
+    tree: cKDTree
+    coords: np.ndarray
+    order: np.ndarray
+    memo: OrderedDict[tuple[float, float, float], int] = field(default_factory=OrderedDict)
+
+    def closest_ids(self, points: Iterable[Iterable[float]]) -> list[int]:
+        keys = [(round(float(x), 9), round(float(y), 9), round(float(z), 9)) for x, y, z in points]
+        missing = list({key for key in keys if key not in self.memo})
+        if missing:
+            _dist, ids = self.tree.query(np.asarray(missing, dtype=np.float64).reshape(-1, 3))
+            self.memo.update(zip(missing, self.order[ids].tolist()))
+        result = [self.memo[key] for key in keys]
+        for key in keys:
+            self.memo.move_to_end(key)
+        while len(self.memo) > _MEMO_SIZE:
+            self.memo.popitem(last=False)
+        return result
+
+    def nearest(self, points: np.ndarray) -> np.ndarray:
+        # Unmemoized bulk lookup for dense samples such as polyline vertices.
+        _dist, ids = self.tree.query(np.asarray(points, dtype=np.float64).reshape(-1, 3))
+        return self.order[ids]
+
+
+def build_landmark_resolver(surface: vtkPolyData, order: np.ndarray | None = None) -> LandmarkResolver:
+    # `order` may be a Morton order saved from an earlier build of the same mesh.
+    cache = GeoCache.get_or_build(surface)
+    if cache.resolver is None:
+        coords = cache.coords
+        # The tree is built over Z-ordered points so spatial neighbours sit together in
+        # memory; ids are mapped back through `order`, the surface itself is untouched.
+        if order is None or order.shape != (coords.shape[0],):
+            order = morton_order(coords)
+        cache.resolver = LandmarkResolver(tree=cKDTree(coords[order]), coords=coords, order=order)
+    return cache.resolver
+
+
+def closest_point_ids(locator: vtkPointLocator, points: Iterable[Iterable[float]]) -> list[int]:
+    return build_landmark_resolver(locator.GetDataSet()).closest_ids(points)
+
+
+def _sorted_unique(keys: np.ndarray) -> np.ndarray:
+    # Sort-based dedupe; np.unique's hash path is several times slower on the
+    # millions of int64 edge keys a large mesh produces.
+    keys = np.sort(keys)
+    if keys.size:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys
+
+
+def build_geodesic_graph(surface: vtkPolyData) -> tuple[csr_matrix, np.ndarray]:
+    cache = GeoCache.get_or_build(surface)
+    if cache.graph is not None:
+        return cache.graph, cache.coords
+
+    coords = cache.coords
+    num_points = coords.shape[0]
+
+    # Same edge set as vtkDijkstraGraphGeodesicPath: consecutive corners of each
+    # polygon, with the last corner wrapping back to the first.
     polys = surface.GetPolys()
-    polys.InitTraversal()
-    id_list = vtkIdList()
-    while polys.GetNextCell(id_list):
-        if id_list.GetNumberOfIds() >= 2:
-            add_cell(id_list.GetId(i) for i in range(id_list.GetNumberOfIds()))
+    offsets = vtk_to_numpy(polys.GetOffsetsArray()).astype(np.int64)
+    connectivity = vtk_to_numpy(polys.GetConnectivityArray()).astype(np.int64)
+    next_corner = np.arange(1, connectivity.size + 1)
+    non_empty = np.diff(offsets) > 0
+    next_corner[offsets[1:][non_empty] - 1] = offsets[:-1][non_empty]
+    src = connectivity
+    dst = connectivity[next_corner] if connectivity.size else connectivity
+
+    lo = np.minimum(src, dst)
+    hi = np.maximum(src, dst)
+    distinct = lo != hi
+    edge_keys = _sorted_unique(lo[distinct] * num_points + hi[distinct])
+    lo = edge_keys // num_points
+    hi = edge_keys % num_points
+    lengths = np.linalg.norm(coords[lo] - coords[hi], axis=1)
+
+    graph = csr_matrix(
+        (np.concatenate([lengths, lengths]), (np.concatenate([lo, hi]), np.concatenate([hi, lo]))),
+        shape=(num_points, num_points),
+    )
+    cache.graph = graph
+    return graph, coords
+
+
+def _path_from_predecessors(predecessors: np.ndarray, start_id: int, end_id: int) -> list[int]:
+    # Walks back from end_id, so ids run end -> start like vtkDijkstraGraphGeodesicPath.
+    path_ids = [end_id]
+    current = end_id
+    while current != start_id:
+        current = int(predecessors[current])
+        if current < 0:
+            return []
+        path_ids.append(current)
+    return path_ids
+
+
+def _polyline_from_points(points: np.ndarray) -> vtkPolyData:
+    count = points.shape[0]
+    vtk_points = vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(np.ascontiguousarray(points), deep=1))
+    lines = vtkCellArray()
+    if count:
+        lines.SetData(
+            numpy_to_vtkIdTypeArray(np.array([0, count], dtype=np.int64), deep=1),
+            numpy_to_vtkIdTypeArray(np.arange(count, dtype=np.int64), deep=1),
+        )
+
+    polyline = vtkPolyData()
+    polyline.SetPoints(vtk_points)
+    polyline.SetLines(lines)
+    return polyline
+
+
+def vertex_cloud(surface: vtkPolyData, point_ids: Sequence[int]) -> vtkPolyData:
+    ids = np.asarray(point_ids, dtype=np.int64)
+    count = ids.shape[0]
+    vtk_points = vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(GeoCache.get_or_build(surface).coords[ids], deep=1))
+    verts = vtkCellArray()
+    if count:
+        verts.SetData(
+            numpy_to_vtkIdTypeArray(np.arange(count + 1, dtype=np.int64), deep=1),
+            numpy_to_vtkIdTypeArray(np.arange(count, dtype=np.int64), deep=1),
+        )
+
+    cloud = vtkPolyData()
+    cloud.SetPoints(vtk_points)
+    cloud.SetVerts(verts)
+    return cloud
 
-    strips = surface.GetStrips()
-    strips.InitTraversal()
-    id_list.Reset()
-    while strips.GetNextCell(id_list):
-        if id_list.GetNumberOfIds() >= 2:
-            add_cell(id_list.GetId(i) for i in range(id_list.GetNumberOfIds()))
 
-    return adjacency
+def compute_geodesic(surface: vtkPolyData, start_id: int, end_id: int) -> GeodesicResult:
+    graph, coords = build_geodesic_graph(surface)
+    predecessors = _edge_length_predecessors(graph, coords, start_id, [end_id])
+    point_ids = _path_from_predecessors(predecessors, start_id, end_id)
+    return GeodesicResult(point_ids=point_ids, polyline=_polyline_from_points(coords[point_ids].astype(np.float32)))
+
+
+def _edge_length_predecessors(
+    graph: csr_matrix,
+    coords: np.ndarray,
+    start_id: int,
+    target_ids: Sequence[int],
+    allowed: np.ndarray | None = None,
+) -> np.ndarray:
+    if allowed is None:
+        allowed = np.ones(coords.shape[0], dtype=bool)
+    targets = np.asarray(target_ids, dtype=np.int64)
+    _dist, predecessors = iso_dijkstra(graph.indptr, graph.indices, graph.data, start_id, targets, allowed)
+    return predecessors
+
+
+def compute_geodesics_one_to_many(
+    surface: vtkPolyData,
+    start_id: int,
+    target_ids: Sequence[int],
+) -> list[GeodesicResult]:
+    # A single search from start_id serves every target and stops once the last
+    # of them is settled.
+    if len(target_ids) == 0:
+        return []
+    graph, coords = build_geodesic_graph(surface)
+    predecessors = _edge_length_predecessors(graph, coords, start_id, target_ids)
+    results = []
+    for target_id in target_ids:
+        point_ids = _path_from_predecessors(predecessors, start_id, target_id)
+        results.append(
+            GeodesicResult(point_ids=point_ids, polyline=_polyline_from_points(coords[point_ids].astype(np.float32)))
+        )
+    return results
+
+
+def get_csr_adjacency(surface: vtkPolyData) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Every pair of points sharing a polygon is connected; strips contribute the
+    # edges of the triangles they encode.
+    cache = GeoCache.get_or_build(surface)
+    if cache.adjacency is None:
+        num_points = cache.coords.shape[0]
+        src_parts = [np.zeros(0, dtype=np.int64)]
+        dst_parts = [np.zeros(0, dtype=np.int64)]
+
+        polys = surface.GetPolys()
+        offsets = vtk_to_numpy(polys.GetOffsetsArray()).astype(np.int64)
+        connectivity = vtk_to_numpy(polys.GetConnectivityArray()).astype(np.int64)
+        sizes = np.diff(offsets)
+        if sizes.size and (sizes == 3).all():
+            cell_sizes = np.array([3])
+        else:
+            cell_sizes = np.unique(sizes[sizes >= 2])
+        for size in cell_sizes:
+            if size == 3 and cell_sizes.size == 1:
+                corners = connectivity.reshape(-1, 3)
+            else:
+                corners = connectivity[offsets[:-1][sizes == size][:, None] + np.arange(size)]
+            first, second = np.triu_indices(size, 1)
+            src_parts.append(corners[:, first].ravel())
+            dst_parts.append(corners[:, second].ravel())
+
+        strips = surface.GetStrips()
+        offsets = vtk_to_numpy(strips.GetOffsetsArray()).astype(np.int64)
+        connectivity = vtk_to_numpy(strips.GetConnectivityArray()).astype(np.int64)
+        if connectivity.size:
+            sizes = np.diff(offsets)
+            remaining = np.repeat(offsets[1:], sizes) - np.arange(connectivity.size) - 1
+            for step in (1, 2):
+                heads = np.flatnonzero(remaining >= step)
+                src_parts.append(connectivity[heads])
+                dst_parts.append(connectivity[heads + step])
+
+        src = np.concatenate(src_parts)
+        dst = np.concatenate(dst_parts)
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        distinct = src != dst
+        edge_keys = _sorted_unique(src[distinct] * num_points + dst[distinct])
+        indptr = np.zeros(num_points + 1, dtype=np.int32)
+        np.cumsum(np.bincount(edge_keys // num_points, minlength=num_points), out=indptr[1:])
+        cache.adjacency = (indptr, (edge_keys % num_points).astype(np.int32))
+    indptr, indices = cache.adjacency
+    return indptr, indices, cache.coords
+
+
+def _anisotropic_edge_weights(surface: vtkPolyData, normal: Sequence[float], penalty: float) -> np.ndarray:
+    # Per-edge cost length * (1 + penalty * |d.n| / length) = length + penalty * |d.n|
+    # over the CSR adjacency. Edge vectors are kept for the life of the geometry and
+    # the weights for the most recent normal and penalty; zero-length edges are
+    # never taken. Both are float32, the precision VTK stores the points in, while
+    # the kernel still sums distances in float64.
+    cache = GeoCache.get_or_build(surface)
+    key = (*normal, penalty)
+    if cache.aniso_weights is not None and cache.aniso_weights[0] == key:
+        return cache.aniso_weights[1]
+    if cache.edge_vectors is None:
+        indptr, indices, coords = get_csr_adjacency(surface)
+        rows = np.repeat(np.arange(indptr.shape[0] - 1), np.diff(indptr))
+        vectors = coords[indices] - coords[rows]
+        cache.edge_vectors = (vectors.astype(np.float32), np.linalg.norm(vectors, axis=1).astype(np.float32))
+    vectors, lengths = cache.edge_vectors
+    weights = lengths + np.float32(penalty) * np.abs(vectors @ np.asarray(normal, dtype=np.float32))
+    weights[lengths == 0.0] = np.float32(np.inf)
+    cache.aniso_weights = (key, weights)
+    return weights
 
 
 def compute_anisotropic_geodesic(
@@ -84,69 +376,19 @@ def compute_anisotropic_geodesic(
     if start_id == end_id:
         return None
 
-    adjacency = _build_point_adjacency(surface)
-    unit_normal = normalize(normal)
-    if unit_normal == (0.0, 0.0, 0.0):
-        unit_normal = (0.0, 0.0, 0.0)
-
-    num_points = surface.GetNumberOfPoints()
-    dist = [float("inf")] * num_points
-    prev = [-1] * num_points
-    dist[start_id] = 0.0
-    heap: list[tuple[float, int]] = [(0.0, start_id)]
-
-    while heap:
-        current_dist, current = heapq.heappop(heap)
-        if current_dist != dist[current]:
-            continue
-        if current == end_id:
-            break
-        px, py, pz = surface.GetPoint(current)
-        for neighbor in adjacency[current]:
-            nx, ny, nz = surface.GetPoint(neighbor)
-            dx = nx - px
-            dy = ny - py
-            dz = nz - pz
-            length = (dx * dx + dy * dy + dz * dz) ** 0.5
-            if length == 0.0:
-                continue
-            if unit_normal == (0.0, 0.0, 0.0):
-                penalty = 1.0
-            else:
-                dir_dot = abs((dx / length) * unit_normal[0] + (dy / length) * unit_normal[1] + (dz / length) * unit_normal[2])
-                penalty = 1.0 + penalty_strength * dir_dot
-            weight = length * penalty
-            next_dist = current_dist + weight
-            if next_dist < dist[neighbor]:
-                dist[neighbor] = next_dist
-                prev[neighbor] = current
-                heapq.heappush(heap, (next_dist, neighbor))
-
-    if prev[end_id] == -1:
+    indptr, indices, xyz = get_csr_adjacency(surface)
+    nx, ny, nz = normalize(normal)
+    # A zero normal means no direction to penalise, so the cost reduces to edge length.
+    penalty = float(penalty_strength) if (nx, ny, nz) != (0.0, 0.0, 0.0) else 0.0
+    weights = _anisotropic_edge_weights(surface, (nx, ny, nz), penalty)
+    prev_f, prev_b, meet_f, meet_b = aniso_bidirectional_dijkstra(indptr, indices, xyz, weights, start_id, end_id)
+    if meet_f < 0:
         return None
 
-    path_ids: list[int] = []
-    current = end_id
-    while current != -1:
-        path_ids.append(current)
-        if current == start_id:
-            break
-        current = prev[current]
-    if path_ids[-1] != start_id:
-        return None
+    path_ids = _path_from_predecessors(prev_f, start_id, int(meet_f))
     path_ids.reverse()
-
-    vtk_points = vtkPoints()
-    lines = vtkCellArray()
-    lines.InsertNextCell(len(path_ids))
-    for idx, point_id in enumerate(path_ids):
-        vtk_points.InsertNextPoint(surface.GetPoint(point_id))
-        lines.InsertCellPoint(idx)
-
-    polyline = vtkPolyData()
-    polyline.SetPoints(vtk_points)
-    polyline.SetLines(lines)
-    return GeodesicResult(point_ids=path_ids, polyline=polyline)
+    path_ids += _path_from_predecessors(prev_b, end_id, int(meet_b))
+    return GeodesicResult(point_ids=path_ids, polyline=_polyline_from_points(xyz[path_ids].astype(np.float32)))
 
 
 def compute_weighted_geodesic(
@@ -158,29 +400,20 @@ def compute_weighted_geodesic(
     if surface.GetNumberOfPoints() != len(weights):
         raise ValueError("Weight count must match number of points")
 
-    scalars = vtkFloatArray()
-    scalars.SetName("geodesic_cost")
-    scalars.SetNumberOfComponents(1)
-    scalars.SetNumberOfTuples(surface.GetNumberOfPoints())
-    for i, value in enumerate(weights):
-        scalars.SetValue(i, float(value))
-
-    point_data = surface.GetPointData()
-    previous_scalars = point_data.GetScalars()
-    point_data.SetScalars(scalars)
+    # Same cost model as vtkDijkstraGraphGeodesicPath with scalar weights: an edge
+    # into v costs length / s(v)^2, or plain length where s(v) is zero.
+    graph, coords = build_geodesic_graph(surface)
+    scalars = np.asarray(weights, dtype=np.float32).astype(np.float64)
+    squared = scalars[graph.indices] ** 2
+    squared[squared == 0.0] = 1.0
 
-    dijkstra = vtkDijkstraGraphGeodesicPath()
-    dijkstra.SetInputData(surface)
-    dijkstra.SetStartVertex(start_id)
-    dijkstra.SetEndVertex(end_id)
-    dijkstra.SetUseScalarWeights(True)
-    dijkstra.Update()
-
-    polyline = dijkstra.GetOutput()
-    point_ids = [int(dijkstra.GetIdList().GetId(i)) for i in range(dijkstra.GetIdList().GetNumberOfIds())]
-
-    point_data.SetScalars(previous_scalars)
-    return GeodesicResult(point_ids=point_ids, polyline=polyline)
+    # The reweighted edges share the cached graph's CSR layout, so the same
+    # early-terminating kernel stops once end_id is settled.
+    targets = np.asarray([end_id], dtype=np.int64)
+    allowed = np.ones(coords.shape[0], dtype=bool)
+    _dist, predecessors = iso_dijkstra(graph.indptr, graph.indices, graph.data / squared, start_id, targets, allowed)
+    point_ids = _path_from_predecessors(predecessors, start_id, end_id)
+    return GeodesicResult(point_ids=point_ids, polyline=_polyline_from_points(coords[point_ids].astype(np.float32)))
 
 
 def compute_geodesic_via(
@@ -189,19 +422,28 @@ def compute_geodesic_via(
     via_id: int,
     end_id: int,
 ) -> GeodesicResult:
-    first = compute_geodesic(surface, start_id, via_id)
-    second = compute_geodesic(surface, via_id, end_id)
+    # Edge lengths are symmetric, so one search from the via point reaches both
+    # ends and the start leg is just read back in reverse.
+    graph, coords = build_geodesic_graph(surface)
+    predecessors = _edge_length_predecessors(graph, coords, via_id, [start_id, end_id])
+    start_leg = _path_from_predecessors(predecessors, via_id, start_id)
+    end_leg = _path_from_predecessors(predecessors, via_id, end_id)
+    if not start_leg or not end_leg:
+        return GeodesicResult(point_ids=[], polyline=_polyline_from_points(np.zeros((0, 3), dtype=np.float32)))
 
-    append = vtkAppendPolyData()
-    append.AddInputData(first.polyline)
-    append.AddInputData(second.polyline)
-    append.Update()
+    # Ids run end -> via -> start; the shared via point is kept once.
+    point_ids = end_leg + start_leg[-2::-1]
+    return GeodesicResult(point_ids=point_ids, polyline=_polyline_from_points(coords[point_ids].astype(np.float32)))
 
-    point_ids = first.point_ids + second.point_ids[1:]
-    return GeodesicResult(point_ids=point_ids, polyline=append.GetOutput())
+
+def _as_vec3(vec: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(vec, dtype=np.float64).reshape(3)
 
 
 def plane_normal(a: Sequence[float], b: Sequence[float], c: Sequence[float]) -> tuple[float, float, float]:
+    if isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and isinstance(c, np.ndarray):
+        nx, ny, nz = _vec3.plane_normal(_as_vec3(a), _as_vec3(b), _as_vec3(c), np.empty(3)).tolist()
+        return (nx, ny, nz)
     ab = (b[0] - a[0], b[1] - a[1], b[2] - a[2])
     ac = (c[0] - a[0], c[1] - a[1], c[2] - a[2])
     nx = ab[1] * ac[2] - ab[2] * ac[1]
@@ -211,6 +453,13 @@ def plane_normal(a: Sequence[float], b: Sequence[float], c: Sequence[float]) ->
 
 
 def normalize(vec: Sequence[float]) -> tuple[float, float, float]:
+    if isinstance(vec, np.ndarray):
+        arr = _as_vec3(vec)
+        mag_sq = float(arr @ arr)
+        if mag_sq == 0:
+            return (0.0, 0.0, 0.0)
+        x, y, z = (arr / np.sqrt(mag_sq)).tolist()
+        return (x, y, z)
     x, y, z = vec
     mag = (x * x + y * y + z * z) ** 0.5
     if mag == 0:
@@ -219,16 +468,16 @@ def normalize(vec: Sequence[float]) -> tuple[float, float, float]:
 
 
 def centroid(points: Sequence[Sequence[float]]) -> tuple[float, float, float]:
-    if not points:
+    arr = np.asarray(points, dtype=np.float64)
+    if arr.size == 0:
         return (0.0, 0.0, 0.0)
-    sx = sum(p[0] for p in points)
-    sy = sum(p[1] for p in points)
-    sz = sum(p[2] for p in points)
-    count = float(len(points))
-    return (sx / count, sy / count, sz / count)
+    mean = arr.reshape(-1, 3).mean(axis=0)
+    return (float(mean[0]), float(mean[1]), float(mean[2]))
 
 
 def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    if isinstance(a, np.ndarray) and isinstance(b, np.ndarray):
+        return float(_as_vec3(a) @ _as_vec3(b))
     return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
 
 
@@ -244,8 +493,6 @@ def scale(a: Sequence[float], s: float) -> tuple[float, float, float]:
     return (a[0] * s, a[1] * s, a[2] * s)
 
 
-
-
 def cross(a: Sequence[float], b: Sequence[float]) -> tuple[float, float, float]:
     return (
         a[1] * b[2] - a[2] * b[1],
@@ -259,16 +506,45 @@ def plane_side(
     normal: Sequence[float],
     point: Sequence[float],
 ) -> int:
+    if isinstance(plane_point, np.ndarray) and isinstance(normal, np.ndarray) and isinstance(point, np.ndarray):
+        return int(_vec3.plane_side(_as_vec3(plane_point), _as_vec3(normal), _as_vec3(point)))
     value = dot(normal, sub(point, plane_point))
     return 1 if value >= 0 else -1
 
 
-def polyline_midpoint(polyline: vtkPolyData) -> tuple[float, float, float]:
+def polyline_midpoint(polyline: vtkPolyData, arc_length: bool = False) -> tuple[float, float, float]:
     points = polyline.GetPoints()
     if points is None or points.GetNumberOfPoints() == 0:
         return (0.0, 0.0, 0.0)
-    mid_index = points.GetNumberOfPoints() // 2
-    return points.GetPoint(mid_index)
+    coords = vtk_to_numpy(points.GetData()).reshape(-1, 3)
+    if arc_length:
+        # Vertex nearest half the path length, which does not drift toward densely
+        # sampled stretches the way the middle index does.
+        travelled = np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))))
+        mid_index = min(int(np.searchsorted(travelled, travelled[-1] / 2.0)), coords.shape[0] - 1)
+        if mid_index > 0 and travelled[-1] / 2.0 - travelled[mid_index - 1] < travelled[mid_index] - travelled[-1] / 2.0:
+            mid_index -= 1
+    else:
+        mid_index = coords.shape[0] // 2
+    mid = coords[mid_index]
+    return (float(mid[0]), float(mid[1]), float(mid[2]))
+
+
+def _clipped_endpoint(
+    graph: csr_matrix,
+    coords: np.ndarray,
+    allowed: np.ndarray,
+    point_id: int,
+    point: Sequence[float],
+) -> int:
+    # A landmark on the cut plane keeps its own vertex as long as that vertex touches
+    # the kept side; anything further off snaps to the nearest kept vertex, as the
+    # clipped mesh used to.
+    if allowed[point_id] or allowed[graph.indices[graph.indptr[point_id] : graph.indptr[point_id + 1]]].any():
+        return point_id
+    kept_ids = np.flatnonzero(allowed)
+    offsets = coords[kept_ids] - np.asarray(point, dtype=np.float64)
+    return int(kept_ids[np.argmin(np.einsum("ij,ij->i", offsets, offsets))])
 
 
 def compute_clipped_geodesic(
@@ -278,29 +554,29 @@ def compute_clipped_geodesic(
     plane_point: Sequence[float],
     normal: Sequence[float],
     keep_side: int,
+    endpoint_ids: tuple[int, int] | None = None,
 ) -> GeodesicResult | None:
-    plane = vtkPlane()
-    plane.SetOrigin(plane_point)
-    plane_normal = normal if keep_side > 0 else (-normal[0], -normal[1], -normal[2])
-    plane.SetNormal(plane_normal)
-
-    clipper = vtkClipPolyData()
-    clipper.SetInputData(surface)
-    clipper.SetClipFunction(plane)
-    clipper.SetInsideOut(False)
-    clipper.Update()
-
-    clipped = clipper.GetOutput()
-    if clipped is None or clipped.GetNumberOfPoints() == 0:
+    # Rather than clipping the mesh, the search never enters a vertex on the
+    # discarded side of the plane; ids refer to the original surface, so callers
+    # that already resolved the endpoints can pass them in.
+    graph, coords = build_geodesic_graph(surface)
+    keep_normal = np.asarray(normal, dtype=np.float64) * (1.0 if keep_side > 0 else -1.0)
+    allowed = (coords - np.asarray(plane_point, dtype=np.float64)) @ keep_normal >= 0.0
+    if not allowed.any():
         return None
 
-    clipped_locator = build_point_locator(clipped)
-    start_id = closest_point_id(clipped_locator, start_point)
-    end_id = closest_point_id(clipped_locator, end_point)
-    result = compute_geodesic(clipped, start_id, end_id)
-    if result.polyline is None or result.polyline.GetNumberOfPoints() == 0:
+    if endpoint_ids is None:
+        endpoint_ids = tuple(build_landmark_resolver(surface).closest_ids((start_point, end_point)))
+    start_id, end_id = endpoint_ids
+    start_id = _clipped_endpoint(graph, coords, allowed, start_id, start_point)
+    end_id = _clipped_endpoint(graph, coords, allowed, end_id, end_point)
+    allowed[[start_id, end_id]] = True
+
+    predecessors = _edge_length_predecessors(graph, coords, start_id, [end_id], allowed)
+    point_ids = _path_from_predecessors(predecessors, start_id, end_id)
+    if not point_ids:
         return None
-    return result
+    return GeodesicResult(point_ids=point_ids, polyline=_polyline_from_points(coords[point_ids].astype(np.float32)))
 
 
 def create_pair_geodesics(
@@ -313,24 +589,24 @@ def create_pair_geodesics(
     anterior_ref_key: str = "E",
     plane_origin_key: str = "A",
 ) -> tuple[str, GeodesicResult, str, GeodesicResult | None]:
-    plane_a = landmarks[plane_keys[0]]
-    plane_b = landmarks[plane_keys[1]]
-    plane_c = landmarks[plane_keys[2]]
-    plane_origin = landmarks[plane_origin_key]
+    plane_a = np.asarray(landmarks[plane_keys[0]], dtype=np.float64)
+    plane_b = np.asarray(landmarks[plane_keys[1]], dtype=np.float64)
+    plane_c = np.asarray(landmarks[plane_keys[2]], dtype=np.float64)
+    plane_origin = np.asarray(landmarks[plane_origin_key], dtype=np.float64)
 
     start_point = landmarks[start_key]
     end_point = landmarks[end_key]
-    ref_point = landmarks[anterior_ref_key]
+    ref_point = np.asarray(landmarks[anterior_ref_key], dtype=np.float64)
 
-    normal = normalize(cross(sub(plane_b, plane_a), sub(plane_c, plane_a)))
-    ref_side = plane_side(plane_origin, normal, ref_point)
+    normal = _vec3.plane_normal_unit(plane_a, plane_b, plane_c, np.empty(3))
 
-    start_id = closest_point_id(locator, start_point)
-    end_id = closest_point_id(locator, end_point)
-    primary = compute_geodesic(surface, start_id, end_id)
+    start_id, end_id = closest_point_ids(locator, (start_point, end_point))
+    (primary,) = compute_geodesics_one_to_many(surface, start_id, [end_id])
 
-    midpoint = polyline_midpoint(primary.polyline)
-    mid_side = plane_side(plane_origin, normal, midpoint)
+    midpoint = np.asarray(polyline_midpoint(primary.polyline), dtype=np.float64)
+    # Reference point and primary midpoint are classified in one batched product.
+    offsets = (np.stack((ref_point, midpoint)) - plane_origin) @ normal
+    ref_side, mid_side = np.where(offsets >= 0, 1, -1).tolist()
 
     if mid_side == ref_side:
         primary_key = f"{start_key}{end_key}_anterior"
@@ -345,9 +621,10 @@ def create_pair_geodesics(
         surface,
         start_point,
         end_point,
-        plane_origin,
-        normal,
+        tuple(plane_origin.tolist()),
+        tuple(normal.tolist()),
         opposite_side,
+        endpoint_ids=(start_id, end_id),
     )
     return primary_key, primary, alternate_key, alternate
 
@@ -361,8 +638,7 @@ def create_simple_geodesic(
 ) -> GeodesicResult | None:
     start_point = landmarks[start_key]
     end_point = landmarks[end_key]
-    start_id = closest_point_id(locator, start_point)
-    end_id = closest_point_id(locator, end_point)
+    start_id, end_id = closest_point_ids(locator, (start_point, end_point))
     result = compute_geodesic(surface, start_id, end_id)
     if result.polyline is None or result.polyline.GetNumberOfPoints() == 0:
         return None
@@ -380,8 +656,7 @@ def create_anisotropic_geodesic(
 ) -> GeodesicResult | None:
     start_point = landmarks[start_key]
     end_point = landmarks[end_key]
-    start_id = closest_point_id(locator, start_point)
-    end_id = closest_point_id(locator, end_point)
+    start_id, end_id = closest_point_ids(locator, (start_point, end_point))
     result = compute_anisotropic_geodesic(surface, start_id, end_id, normal, penalty_strength)
     if result is None or result.polyline is None or result.polyline.GetNumberOfPoints() == 0:
         return None
@@ -394,31 +669,13 @@ def compute_ma_plane_normal(
     h: Sequence[float],
     i: Sequence[float],
 ) -> tuple[float, float, float] | None:
-    plane = _best_fit_plane([e, f, h, i])
-    if plane is None:
+    # Total least-squares plane through E/F/H/I: the right singular vector of the
+    # centred points with the smallest singular value. Its sign is arbitrary, which
+    # is fine since the anisotropic penalty only uses |d.n|.
+    points = np.array((e, f, h, i), dtype=np.float64)
+    centred = points - points.mean(axis=0)
+    _u, singular, vt = np.linalg.svd(centred, full_matrices=False)
+    if not np.isfinite(singular).all() or singular[1] <= 1e-12 * max(singular[0], 1e-300):
         return None
-    _origin, normal = plane
-    return normalize(normal)
-
-
-def _best_fit_plane(points: Sequence[Sequence[float]]) -> tuple[tuple[float, float, float], tuple[float, float, float]] | None:
-    if len(points) < 3:
-        return None
-    vtk_pts = vtkPoints()
-    for point in points:
-        vtk_pts.InsertNextPoint(point)
-    origin = [0.0, 0.0, 0.0]
-    normal = [0.0, 0.0, 0.0]
-    try:
-        vtkPlane.ComputeBestFittingPlane(vtk_pts, origin, normal)
-        best_normal = normalize(normal)
-    except AttributeError:
-        best_normal = normalize(cross(sub(points[1], points[0]), sub(points[2], points[0])))
-        origin = list(centroid(points))
-    if best_normal == (0.0, 0.0, 0.0):
-        return None
-    return (origin[0], origin[1], origin[2]), best_normal
-
-
-
-
+    normal = vt[-1]
+    return (float(normal[0]), float(normal[1]), float(normal[2]))
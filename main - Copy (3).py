@@ -1,32 +1,46 @@
+import functools
 import os
 import sys
 from pathlib import Path
 
+import numpy as np
 from PySide6 import QtCore, QtGui, QtWidgets
 from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 import vtkmodules.vtkRenderingOpenGL2  # noqa: F401
-from vtkmodules.vtkCommonDataModel import vtkPointLocator
+from vtkmodules.util.numpy_support import vtk_to_numpy
 from vtkmodules.vtkIOLegacy import vtkPolyDataReader
 from vtkmodules.vtkFiltersSources import vtkSphereSource
-from vtkmodules.vtkFiltersCore import vtkClipPolyData
-from vtkmodules.vtkCommonDataModel import vtkPlane
 from vtkmodules.vtkInteractionStyle import vtkInteractorStyleTrackballCamera
 from vtkmodules.vtkRenderingCore import (
     vtkActor,
-    vtkCellPicker,
+    vtkHardwarePicker,
     vtkPolyDataMapper,
     vtkRenderer,
 )
 
 from geodesics import (
-    build_point_locator,
-    closest_point_id,
+    build_landmark_resolver,
+    compute_clipped_geodesic,
     compute_geodesic,
     normalize,
     sub,
 )
 
 
+def _build_landmark_sphere():
+    sphere = vtkSphereSource()
+    sphere.SetRadius(1.0)
+    sphere.SetThetaResolution(16)
+    sphere.SetPhiResolution(16)
+    sphere.Update()
+    return sphere.GetOutput()
+
+
+# One sphere shared by every landmark actor, which differ only by position.
+_LANDMARK_SPHERE = _build_landmark_sphere()
+
+
+@functools.lru_cache(maxsize=1)
 def detect_os() -> str:
     platform = sys.platform
     if platform.startswith("win"):
@@ -54,13 +68,22 @@ class MainWindow(QtWidgets.QMainWindow):
         self._initial_file = initial_file
         self._pending_file = None
         self._polydata = None
-        self._point_locator = None
-        self._geo_locator = None
-        self._picker = vtkCellPicker()
-        self._picker.SetTolerance(0.01)
+        self._normal_np = None
+        self._d0 = 0.0
+        self._landmark_resolver = None
+        self._mesh_file_stamp = None
+        self._picker = vtkHardwarePicker()
+        self._picker.SnapToMeshPointOn()
         self._landmarks = {}
         self._landmark_actors = {}
+        self._landmark_mapper = None
         self._geodesic_actors: dict[str, vtkActor] = {}
+        self._ab_cache_key = None
+        # Landmark edits within 50 ms of each other share one geodesic rebuild.
+        self._geo_timer = QtCore.QTimer(self)
+        self._geo_timer.setSingleShot(True)
+        self._geo_timer.setInterval(50)
+        self._geo_timer.timeout.connect(self._update_geodesics_now)
         self._current_step_index = 0
         self._steps = self._build_steps()
 
@@ -173,6 +196,13 @@ class MainWindow(QtWidgets.QMainWindow):
             self.load_mesh(file_path)
 
     def load_mesh(self, file_path: str) -> None:
+        path = Path(file_path).resolve()
+        try:
+            stamp = (str(path), path.stat().st_mtime_ns)
+        except OSError:
+            stamp = None
+        if stamp is not None and stamp == self._mesh_file_stamp:
+            return
         polydata = self._read_vtk_polydata(Path(file_path))
         if polydata is None:
             QtWidgets.QMessageBox.warning(
@@ -183,10 +213,9 @@ class MainWindow(QtWidgets.QMainWindow):
             return
 
         self._polydata = polydata
-        self._point_locator = vtkPointLocator()
-        self._point_locator.SetDataSet(polydata)
-        self._point_locator.BuildLocator()
-        self._geo_locator = build_point_locator(polydata)
+        self._landmark_resolver = build_landmark_resolver(polydata)
+        self._mesh_file_stamp = stamp
+        self._ab_cache_key = None
 
         self._display_polydata(polydata)
         self._update_mesh_info(polydata, file_path)
@@ -293,11 +322,12 @@ class MainWindow(QtWidgets.QMainWindow):
             interactor.GetInteractorStyle().OnLeftButtonDown()
             return
 
-        pick_pos = self._picker.GetPickPosition()
-        if self._point_locator is None:
-            return
-
-        point_id = self._point_locator.FindClosestPoint(pick_pos)
+        point_id = self._picker.GetPointId()
+        if self._picker.GetActor() is not self._mesh_actor or point_id < 0:
+            # Hit a geodesic or landmark; resolve the world position instead.
+            if self._landmark_resolver is None:
+                return
+            point_id = self._landmark_resolver.closest_ids([self._picker.GetPickPosition()])[0]
         point = self._polydata.GetPoint(point_id)
         self._set_landmark_point(point)
 
@@ -326,17 +356,12 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         actor = self._landmark_actors.get(key)
         if actor is None:
-            sphere = vtkSphereSource()
-            sphere.SetRadius(1.0)
-            sphere.SetThetaResolution(16)
-            sphere.SetPhiResolution(16)
-            sphere.Update()
-
-            mapper = vtkPolyDataMapper()
-            mapper.SetInputConnection(sphere.GetOutputPort())
+            if self._landmark_mapper is None:
+                self._landmark_mapper = vtkPolyDataMapper()
+                self._landmark_mapper.SetInputData(_LANDMARK_SPHERE)
 
             actor = vtkActor()
-            actor.SetMapper(mapper)
+            actor.SetMapper(self._landmark_mapper)
             actor.GetProperty().SetColor(1.0, 0.4, 0.2)
             self._renderer.AddActor(actor)
             self._landmark_actors[key] = actor
@@ -344,7 +369,10 @@ class MainWindow(QtWidgets.QMainWindow):
         actor.SetPosition(point)
 
     def _update_geodesics(self) -> None:
-        if self._polydata is None or self._geo_locator is None or self._renderer is None:
+        self._geo_timer.start()
+
+    def _update_geodesics_now(self) -> None:
+        if self._polydata is None or self._landmark_resolver is None or self._renderer is None:
             return
         required = {"A", "B", "C", "D", "E"}
         if not required.issubset(self._landmarks.keys()):
@@ -354,10 +382,19 @@ class MainWindow(QtWidgets.QMainWindow):
             )
             return
 
+        # The AB pair depends only on A, B, C and E; moving any other landmark keeps
+        # the actors from the last successful run.
+        ab_key = tuple(self._landmarks[key] for key in ("A", "B", "C", "E"))
+        if ab_key == self._ab_cache_key:
+            return
+
         self._remove_geodesic("AB_anterior")
         self._remove_geodesic("AB_posterior")
         if self._create_ab_geodesics():
+            self._ab_cache_key = ab_key
             self.statusBar().showMessage("AB geodesics updated")
+        else:
+            self._ab_cache_key = None
         self._vtk_widget.GetRenderWindow().Render()
 
     def _create_ab_geodesics(self) -> bool:
@@ -367,14 +404,13 @@ class MainWindow(QtWidgets.QMainWindow):
         e = self._landmarks["E"]
 
         normal = normalize(self._cross(sub(b, a), sub(c, a)))
-        e_side = self._plane_side(a, normal, e)
+        self._set_side_plane(a, normal)
+        e_side = self._cached_plane_side(e)
 
-        start_id = closest_point_id(self._geo_locator, a)
-        end_id = closest_point_id(self._geo_locator, b)
+        start_id, end_id = self._landmark_resolver.closest_ids((a, b))
         primary = compute_geodesic(self._polydata, start_id, end_id)
 
-        midpoint = self._polyline_midpoint(primary.polyline)
-        mid_side = self._plane_side(a, normal, midpoint)
+        mid_side = self._polyline_majority_side(primary.polyline)
 
         if mid_side == e_side:
             primary_key = "AB_anterior"
@@ -418,16 +454,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self._renderer.RemoveActor(actor)
 
     @staticmethod
-    def _cross(a: tuple[float, float, float], b: tuple[float, float, float]) -> tuple[float, float, float]:
-        return (
-            a[1] * b[2] - a[2] * b[1],
-            a[2] * b[0] - a[0] * b[2],
-            a[0] * b[1] - a[1] * b[0],
-        )
+    def _cross(a: tuple[float, float, float], b: tuple[float, float, float]) -> np.ndarray:
+        return np.cross(a, b)
 
     @staticmethod
     def _dot(a: tuple[float, float, float], b: tuple[float, float, float]) -> float:
-        return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+        return float(np.dot(a, b))
 
     def _plane_side(
         self,
@@ -438,31 +470,41 @@ class MainWindow(QtWidgets.QMainWindow):
         value = self._dot(normal, sub(point, plane_point))
         return 1 if value >= 0 else -1
 
-    def _polyline_midpoint(self, polyline) -> tuple[float, float, float]:
-        points = polyline.GetPoints()
-        if points is None or points.GetNumberOfPoints() == 0:
-            return (0.0, 0.0, 0.0)
-        mid_index = points.GetNumberOfPoints() // 2
-        return points.GetPoint(mid_index)
-
-    def _plane_side_weights(
+    def _set_side_plane(
         self,
         plane_point: tuple[float, float, float],
         normal: tuple[float, float, float],
-        keep_side: int,
-        allow_ids: set[int],
-    ) -> list[float]:
-        weights: list[float] = []
-        if self._polydata is None:
-            return weights
-        for i in range(self._polydata.GetNumberOfPoints()):
-            if i in allow_ids:
-                weights.append(1.0)
-                continue
-            point = self._polydata.GetPoint(i)
-            side = self._plane_side(plane_point, normal, point)
-            weights.append(1.0 if side == keep_side else 1.0e8)
-        return weights
+    ) -> None:
+        # The plane is stored as normal and offset d0 = normal . plane_point so each
+        # side test is a single dot product.
+        self._normal_np = np.asarray(normal, dtype=np.float64)
+        self._d0 = float(self._normal_np @ np.asarray(plane_point, dtype=np.float64))
+
+    def _cached_plane_side(self, point: tuple[float, float, float]) -> int:
+        return 1 if float(self._normal_np @ np.asarray(point, dtype=np.float64)) - self._d0 >= 0 else -1
+
+    @staticmethod
+    def _polyline_to_np(polyline) -> np.ndarray:
+        points = polyline.GetPoints()
+        if points is None:
+            return np.zeros((0, 3))
+        return vtk_to_numpy(points.GetData()).reshape(-1, 3)
+
+    def _polyline_midpoint(self, polyline) -> tuple[float, float, float]:
+        arr = self._polyline_to_np(polyline)
+        if arr.shape[0] == 0:
+            return (0.0, 0.0, 0.0)
+        x, y, z = arr[arr.shape[0] // 2].tolist()
+        return (x, y, z)
+
+    def _polyline_majority_side(self, polyline) -> int:
+        # Side holding most of the path's vertices; steadier than the midpoint alone
+        # when the path runs close to the plane.
+        arr = self._polyline_to_np(polyline)
+        if arr.shape[0] == 0:
+            return self._cached_plane_side(self._polyline_midpoint(polyline))
+        above = int(np.count_nonzero(arr @ self._normal_np - self._d0 >= 0))
+        return 1 if above > arr.shape[0] // 2 else -1
 
     def _compute_ab_alternate(
         self,
@@ -471,31 +513,21 @@ class MainWindow(QtWidgets.QMainWindow):
         normal: tuple[float, float, float],
         keep_side: int,
     ):
-        if self._polydata is None:
+        if self._polydata is None or self._landmark_resolver is None:
             return None
 
-        plane = vtkPlane()
-        plane.SetOrigin(a)
-        plane_normal = normal if keep_side > 0 else (-normal[0], -normal[1], -normal[2])
-        plane.SetNormal(plane_normal)
-
-        clipper = vtkClipPolyData()
-        clipper.SetInputData(self._polydata)
-        clipper.SetClipFunction(plane)
-        clipper.SetInsideOut(False)
-        clipper.Update()
-
-        clipped = clipper.GetOutput()
-        if clipped is None or clipped.GetNumberOfPoints() == 0:
-            return None
-
-        clipped_locator = build_point_locator(clipped)
-        start_id = closest_point_id(clipped_locator, a)
-        end_id = closest_point_id(clipped_locator, b)
-        result = compute_geodesic(clipped, start_id, end_id)
-        if result.polyline is None or result.polyline.GetNumberOfPoints() == 0:
-            return None
-        return result
+        # Same hard plane barrier as clipping, but applied as a vertex mask on the
+        # original mesh: no clipped copy and no second locator.
+        start_id, end_id = self._landmark_resolver.closest_ids((a, b))
+        return compute_clipped_geodesic(
+            self._polydata,
+            a,
+            b,
+            a,
+            normal,
+            keep_side,
+            endpoint_ids=(start_id, end_id),
+        )
 
 
 
@@ -1,38 +1,79 @@
+import functools
+import math
 import os
 import sys
 # workaround for mac to make QT work with VTK
 if sys.platform == "darwin":
     import vtkmodules.qt
     vtkmodules.qt.QVTKRWIBase = "QOpenGLWidget"
+from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
 from PySide6 import QtCore, QtGui, QtWidgets
 from vtkmodules.qt.QVTKRenderWindowInteractor import QVTKRenderWindowInteractor
 import vtkmodules.vtkRenderingOpenGL2  # noqa: F401
-from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPointLocator, vtkPolyData
-from vtkmodules.vtkCommonCore import vtkIntArray, vtkPoints
+from vtkmodules.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+from vtkmodules.vtkCommonDataModel import vtkPolyData
+from vtkmodules.vtkCommonCore import vtkIntArray, vtkPoints, vtkUnsignedCharArray
 from vtkmodules.vtkIOLegacy import vtkPolyDataReader, vtkPolyDataWriter
+from vtkmodules.vtkIOXML import vtkXMLPolyDataReader
 from vtkmodules.vtkFiltersCore import vtkAppendPolyData
 from vtkmodules.vtkFiltersSources import vtkSphereSource
 from vtkmodules.vtkInteractionStyle import vtkInteractorStyleTrackballCamera
 from vtkmodules.vtkCommonCore import vtkLookupTable
 from vtkmodules.vtkRenderingCore import (
     vtkActor,
-    vtkCellPicker,
+    vtkGlyph3DMapper,
+    vtkHardwarePicker,
     vtkPolyDataMapper,
     vtkRenderer,
 )
 
+import _mesh_cache
+from _vec3 import nearest_point_index
 from geodesics import (
+    build_landmark_resolver,
     build_point_locator,
     compute_ma_plane_normal,
     create_anisotropic_geodesic,
     create_pair_geodesics,
     create_simple_geodesic,
+    release_geo_cache,
+    vertex_cloud,
 )
 from regions import compute_segment_ids
 
 
+def _build_landmark_sphere() -> vtkPolyData:
+    sphere = vtkSphereSource()
+    sphere.SetRadius(1.0)
+    sphere.SetThetaResolution(16)
+    sphere.SetPhiResolution(16)
+    sphere.Update()
+    return sphere.GetOutput()
+
+
+# Glyph source instanced at every landmark position by the single landmark actor.
+_LANDMARK_SPHERE = _build_landmark_sphere()
+
+# Segment colours by SegmentId; entry 0 (unassigned) turns white once every
+# required landmark is placed.
+_SEGMENT_PALETTE = (
+    (0.6, 0.6, 0.6),
+    (0.89, 0.10, 0.11),
+    (0.22, 0.49, 0.72),
+    (0.30, 0.69, 0.29),
+    (0.60, 0.31, 0.64),
+    (1.00, 0.50, 0.00),
+    (0.65, 0.34, 0.16),
+    (0.97, 0.51, 0.75),
+    (0.0, 1.0, 0.0),
+    (0.45, 0.45, 0.45),
+)
+
+
+@functools.lru_cache(maxsize=1)
 def detect_os() -> str:
     platform = sys.platform
     if platform.startswith("win"):
@@ -41,9 +82,13 @@ def detect_os() -> str:
         return "mac"
     if platform.startswith("linux"):
         try:
-            with open("/proc/sys/kernel/osrelease", "r", encoding="utf-8") as handle:
-                if "microsoft" in handle.read().lower():
-                    return "wsl"
+            fd = os.open("/proc/sys/kernel/osrelease", os.O_RDONLY)
+            try:
+                release = os.read(fd, 256)
+            finally:
+                os.close(fd)
+            if b"microsoft" in release.lower():
+                return "wsl"
         except OSError:
             pass
         return "linux"
@@ -51,6 +96,75 @@ def detect_os() -> str:
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    _mesh_read = QtCore.Signal(str, object, int, object)
+
+    # Landmarks each geodesic group depends on, and the lines it produces.
+    _AB_CD_REQUIRED = frozenset({"A", "B", "C", "D", "E"})
+    _AB_KEYS = frozenset({"A", "B", "C", "E"})
+    _CD_KEYS = frozenset({"A", "C", "D", "E"})
+    _AB_LINES = frozenset({"AB_anterior", "AB_posterior"})
+    _CD_LINES = frozenset({"CD_anterior", "CD_posterior"})
+    _LAA_KEYS = frozenset({"LAA1", "LAA2", "D", "F"})
+    _LAA_LINES = frozenset({"LAA1_LAA2_anterior", "LAA1_LAA2_posterior"})
+    # LAA3/LAA4 and their geodesics also follow A.
+    _LAA_DERIVED_KEYS = _LAA_KEYS | {"A"}
+    _MA_KEYS = frozenset({"E", "F", "H", "I"})
+    # key, start landmark, end landmark, colour; bent towards the MA plane.
+    _MA_GEODESICS = (
+        ("EF_aniso", "E", "F", (0.9, 0.2, 0.2)),
+        ("FH_aniso", "F", "H", (0.2, 0.9, 0.2)),
+        ("HI_aniso", "H", "I", (0.2, 0.2, 0.9)),
+        ("IE_aniso", "I", "E", (0.9, 0.7, 0.2)),
+    )
+    _MA_LINES = tuple(spec[0] for spec in _MA_GEODESICS)
+    _MA_PENALTY = 2.0
+    _SEGMENTED_REQUIRED = frozenset({"A", "B", "C", "D", "E", "F", "H", "I", "LAA1", "LAA2"})
+
+    # key, start landmark, end landmark, colour
+    _SIMPLE_GEODESICS = (
+        ("AC", "A", "C", (0.2, 0.8, 1.0)),
+        ("BD", "B", "D", (0.2, 0.8, 1.0)),
+        ("CE", "C", "E", (0.7, 0.9, 0.3)),
+        ("BH", "B", "H", (0.7, 0.9, 0.3)),
+        ("DI", "D", "I", (0.7, 0.9, 0.3)),
+        ("X1_X2", "X1", "X2", (0.8, 0.8, 0.2)),
+        ("X2_X3", "X2", "X3", (0.8, 0.8, 0.2)),
+        ("X3_X1", "X3", "X1", (0.8, 0.8, 0.2)),
+    )
+    # name prefix, start, end, third plane landmark, anterior reference, plane origin
+    _PAIR_GEODESICS = (
+        ("A1_A2", "A1", "A2", "D", "F", "D"),
+        ("B1_B2", "B1", "B2", "D", "F", "D"),
+        ("C1_C2", "C1", "C2", "A", "E", "A"),
+        ("D1_D2", "D1", "D2", "A", "E", "A"),
+    )
+    # name prefix, start, end, cutting-plane landmarks, trigger keys, lines; both
+    # use E as the anterior reference and A as the plane origin.
+    _AB_CD_PAIRS = (
+        ("AB", "A", "B", ("A", "B", "C"), _AB_KEYS, _AB_LINES),
+        ("CD", "C", "D", ("A", "C", "D"), _CD_KEYS, _CD_LINES),
+    )
+    # Every geodesic key and the landmarks whose edits invalidate it.
+    _GEODESIC_DEPENDENCIES = {
+        "AB_anterior": _AB_KEYS,
+        "AB_posterior": _AB_KEYS,
+        "CD_anterior": _CD_KEYS,
+        "CD_posterior": _CD_KEYS,
+        **{key: frozenset({start, end}) for key, start, end, _color in _SIMPLE_GEODESICS},
+        "LAA1_LAA2_anterior": _LAA_KEYS,
+        "LAA1_LAA2_posterior": _LAA_KEYS,
+        "A_LAA3": _LAA_DERIVED_KEYS,
+        "F_LAA4": _LAA_KEYS,
+        **{
+            f"{prefix}_{side}": frozenset({start, end, plane, ref, origin})
+            for prefix, start, end, plane, ref, origin in _PAIR_GEODESICS
+            for side in ("anterior", "posterior")
+        },
+        **dict.fromkeys(_MA_LINES, _MA_KEYS),
+    }
+
+    _locator_ready = QtCore.Signal(object, object, object, int)
+
     def __init__(self, initial_file: str | None = None) -> None:
         super().__init__()
         self.setWindowTitle("Segmenter")
@@ -64,24 +178,45 @@ class MainWindow(QtWidgets.QMainWindow):
         self._pending_file = None
         self._polydata = None
         self._mesh_file_path = None
+        self._mesh_file_stamp = None
         self._last_segment_ids = None
         self._last_segment_error = None
-        self._point_locator = None
+        self._landmark_resolver = None
         self._geo_locator = None
         self._renderer = vtkRenderer()
-        self._picker = vtkCellPicker()
-        self._picker.SetTolerance(0.01)
+        # Reads the picked cell from the GPU selection buffer and snaps to its
+        # nearest mesh point, so a mesh hit needs no locator query.
+        self._picker = vtkHardwarePicker()
+        self._picker.SnapToMeshPointOn()
         self._landmarks: dict[str, tuple[float, float, float]] = {}
-        self._landmark_actors: dict[str, vtkActor] = {}
-        self._geodesic_actors: dict[str, vtkActor] = {}
+        self._landmark_points = vtkPoints()
+        self._landmark_polydata = vtkPolyData()
+        self._landmark_polydata.SetPoints(self._landmark_points)
+        self._landmark_index: dict[str, int] = {}
+        self._landmark_keys: list[str] = []
+        self._landmark_actor = None
+        self._geodesic_layers: dict[float, vtkActor] = {}
+        self._geodesic_styles: dict[str, tuple[tuple[float, float, float], float]] = {}
+        self._dirty_geodesic_widths: set[float] = set()
         self._geodesic_lines: dict[str, object] = {}
+        self._geodesic_inputs: dict[str, tuple] = {}
+        self._ma_normal_key = None
+        self._ma_normal = None
         self._aux_actors: dict[str, vtkActor] = {}
         self._segment_lut = self._build_segment_lut()
         self._current_step_index = 0
         self._steps = self._build_steps()
+        self._step_items: list[QtWidgets.QListWidgetItem] = []
+        self._step_completed: list[bool] = []
         self._message_box = None
         self._error_box = None
-        self._updating_steps = False
+        self._render_suspended = 0
+        self._render_dirty = False
+        self._loading_stamp = None
+        self._load_token = 0
+        self._mesh_token = 0
+        self._mesh_read.connect(self._on_mesh_read)
+        self._locator_ready.connect(self._on_locator_ready)
 
         central = QtWidgets.QWidget(self)
         layout = QtWidgets.QHBoxLayout(central)
@@ -98,6 +233,13 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._vtk_widget.GetRenderWindow().AddRenderer(self._renderer)
         self._setup_shortcuts()
+
+        # Landmark bursts (rapid re-clicks) collapse into one geodesic update.
+        self._pending_geodesic_landmarks: set[str] = set()
+        self._geo_timer = QtCore.QTimer(self)
+        self._geo_timer.setSingleShot(True)
+        self._geo_timer.setInterval(50)
+        self._geo_timer.timeout.connect(self._flush_geodesic_updates)
         self.statusBar().showMessage("")
 
     def _build_left_panel(self) -> QtWidgets.QWidget:
@@ -128,7 +270,6 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self._steps_list = QtWidgets.QListWidget(landmarks_group)
         self._steps_list.currentRowChanged.connect(self._on_step_changed)
-        self._steps_list.itemChanged.connect(self._on_step_item_changed)
         self._steps_list.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
         landmarks_layout.addWidget(self._steps_list)
         self._delete_landmark_button = QtWidgets.QPushButton("Delete landmark", landmarks_group)
@@ -188,8 +329,35 @@ class MainWindow(QtWidgets.QMainWindow):
             self._pending_file = None
             self.load_mesh(file_path)
 
-    def load_mesh(self, file_path: str) -> None:
-        polydata = self._read_vtk_polydata(Path(file_path))
+    def load_mesh(self, file_path: str, force: bool = False) -> None:
+        stamp = self._file_stamp(file_path)
+        if not force and stamp is not None and stamp in (self._mesh_file_stamp, self._loading_stamp):
+            return
+        # Only the most recent request is displayed; earlier reads still in flight are
+        # dropped when they arrive.
+        self._load_token += 1
+        token = self._load_token
+        self._loading_stamp = stamp
+        self.statusBar().showMessage(f"Loading {Path(file_path).name}...")
+        QtCore.QThreadPool.globalInstance().start(lambda: self._read_mesh_async(file_path, stamp, token))
+
+    def _release_mesh_caches(self) -> None:
+        # Called when the new mesh replaces the old one; until then the old mesh stays
+        # on screen with its resolver and locator, so picking keeps working.
+        if self._polydata is not None:
+            release_geo_cache(self._polydata)
+        self._landmark_resolver = None
+        self._geo_locator = None
+
+    def _read_mesh_async(self, file_path: str, stamp, token: int) -> None:
+        # Runs on a pool thread; the signal is delivered queued on the GUI thread.
+        self._mesh_read.emit(file_path, stamp, token, self._read_vtk_polydata(Path(file_path)))
+
+    def _on_mesh_read(self, file_path: str, stamp, token: int, polydata) -> None:
+        if token != self._load_token:
+            return
+        self._loading_stamp = None
+        self.statusBar().clearMessage()
         if polydata is None:
             QtWidgets.QMessageBox.warning(
                 self,
@@ -198,16 +366,41 @@ class MainWindow(QtWidgets.QMainWindow):
             )
             return
 
+        self._release_mesh_caches()
         self._polydata = polydata
+        self._mesh_token = token
+        self._geodesic_inputs.clear()
         self._mesh_file_path = file_path
-        self._point_locator = vtkPointLocator()
-        self._point_locator.SetDataSet(polydata)
-        self._point_locator.BuildLocator()
-        self._geo_locator = build_point_locator(polydata)
+        self._mesh_file_stamp = stamp
 
         self._display_polydata(polydata)
         self._update_mesh_info(polydata, file_path)
         self._append_message(f"Mesh loaded: {Path(file_path).name}")
+        QtCore.QThreadPool.globalInstance().start(lambda: self._build_locator_async(polydata, file_path, token))
+
+    def _build_locator_async(self, polydata, file_path: str, token: int) -> None:
+        # Runs on a pool thread; the signal is delivered queued on the GUI thread. A
+        # mesh replaced before the build starts is skipped rather than given a fresh
+        # GeoCache after its release.
+        if token != self._mesh_token:
+            return
+        path = Path(file_path)
+        order = _mesh_cache.load_order(path)
+        resolver = build_landmark_resolver(polydata, order)
+        if resolver.order is not order:
+            _mesh_cache.store_order(path, resolver.order)
+        locator = build_point_locator(polydata)
+        self._locator_ready.emit(polydata, resolver, locator, token)
+
+    def _on_locator_ready(self, polydata, resolver, locator, token: int) -> None:
+        # A build for a mesh that has since been replaced is dropped; one still
+        # running while another file loads belongs to the mesh on screen and is kept.
+        if token != self._mesh_token or polydata is not self._polydata:
+            return
+        self._landmark_resolver = resolver
+        self._geo_locator = locator
+        if self._pending_geodesic_landmarks:
+            self._flush_geodesic_updates()
 
     def _select_overlay_mesh(self) -> None:
         options = QtWidgets.QFileDialog.Options()
@@ -216,7 +409,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self,
             "Open Reference Mesh",
             "",
-            "VTK Files (*.vtk)",
+            "VTK Files (*.vtk *.vtp)",
             options=options,
         )
         if not file_path:
@@ -239,40 +432,67 @@ class MainWindow(QtWidgets.QMainWindow):
             self._overlay_toggle.setChecked(True)
         self._append_message(f"Reference mesh loaded: {Path(file_path).name}")
 
+    @staticmethod
+    def _file_stamp(file_path: str) -> tuple[str, int] | None:
+        # Same resolved path and modification time means the mesh on screen is
+        # already this file.
+        try:
+            path = Path(file_path).resolve()
+            return str(path), path.stat().st_mtime_ns
+        except OSError:
+            return None
+
     def _read_vtk_polydata(self, path: Path):
-        reader = vtkPolyDataReader()
+        polydata = _mesh_cache.load(path)
+        if polydata is not None and polydata.GetNumberOfPoints() > 0:
+            return polydata
+        if path.suffix.lower() == ".vtp":
+            reader = vtkXMLPolyDataReader()
+        else:
+            # Only the default attribute of each kind is loaded; that still covers
+            # the active SegmentId scalars of a previously saved result.
+            reader = vtkPolyDataReader()
+            reader.ReadAllScalarsOff()
+            reader.ReadAllVectorsOff()
+            reader.ReadAllNormalsOff()
+            reader.ReadAllTensorsOff()
+            reader.ReadAllFieldsOff()
         reader.SetFileName(str(path))
         reader.Update()
         polydata = reader.GetOutput()
         if polydata is None or polydata.GetNumberOfPoints() == 0:
             return None
+        _mesh_cache.store(path, polydata)
         return polydata
 
     def _display_polydata(self, polydata) -> None:
-        mapper = vtkPolyDataMapper()
-        mapper.SetInputData(polydata)
-        mapper.SetScalarModeToUsePointData()
-        mapper.SelectColorArray("SegmentId")
-        mapper.SetLookupTable(self._segment_lut)
-        mapper.SetScalarRange(0, 9)
-        mapper.SetScalarVisibility(True)
-
-        actor = vtkActor()
-        actor.SetMapper(mapper)
-
-        if self._mesh_actor is not None:
-            self._renderer.RemoveActor(self._mesh_actor)
-
-        self._mesh_actor = actor
-        self._mesh_mapper = mapper
-        self._renderer.AddActor(actor)
+        # The mesh mapper and actor are built once and only get new input on later
+        # loads, so the shader program and colouring state are kept.
+        if self._mesh_actor is None:
+            mapper = vtkPolyDataMapper()
+            mapper.SetScalarModeToUsePointData()
+            mapper.SelectColorArray("SegmentId")
+            mapper.SetLookupTable(self._segment_lut)
+            mapper.SetScalarRange(0, 9)
+            # Scalars stay visible for the SegmentId colouring; Static only skips the
+            # pipeline update, new segment ids still refresh the buffers through mtime.
+            mapper.SetScalarVisibility(True)
+            mapper.StaticOn()
+
+            self._mesh_actor = vtkActor()
+            self._mesh_actor.SetMapper(mapper)
+            self._mesh_mapper = mapper
+            self._renderer.AddActor(self._mesh_actor)
+
+        self._mesh_mapper.SetInputData(polydata)
         self._renderer.ResetCamera()
-        self._vtk_widget.GetRenderWindow().Render()
+        self._request_render()
 
     def _display_overlay_polydata(self, polydata) -> None:
         mapper = vtkPolyDataMapper()
         mapper.SetInputData(polydata)
         mapper.SetScalarVisibility(False)
+        mapper.StaticOn()
 
         actor = vtkActor()
         actor.SetMapper(mapper)
@@ -286,14 +506,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self._overlay_actor = actor
         self._overlay_mapper = mapper
         self._renderer.AddActor(actor)
-        self._vtk_widget.GetRenderWindow().Render()
+        self._request_render()
 
     def _toggle_overlay_visibility(self, visible: bool) -> None:
         if self._overlay_actor is None:
             return
         self._overlay_actor.SetVisibility(1 if visible else 0)
-        if self._vtk_widget is not None:
-            self._vtk_widget.GetRenderWindow().Render()
+        self._request_render()
 
     def _update_mesh_info(self, polydata, file_path: str) -> None:
         num_points = polydata.GetNumberOfPoints()
@@ -330,24 +549,31 @@ class MainWindow(QtWidgets.QMainWindow):
         ]
 
     def _populate_steps(self) -> None:
+        # Updates are held off so the list lays out and repaints once, not per item.
+        self._steps_list.setUpdatesEnabled(False)
         self._steps_list.blockSignals(True)
-        self._updating_steps = True
         self._steps_list.clear()
+        self._step_items = []
         for step in self._steps:
             item = QtWidgets.QListWidgetItem(step["label"])
             item.setData(QtCore.Qt.UserRole, step["key"])
+            # Check marks are display-only; only _set_step_completed changes them.
+            item.setFlags(QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled)
             item.setCheckState(QtCore.Qt.Unchecked)
-            item.setData(QtCore.Qt.UserRole + 1, False)
             self._steps_list.addItem(item)
-        self._updating_steps = False
+            self._step_items.append(item)
+        self._step_completed = [False] * len(self._step_items)
         self._steps_list.blockSignals(False)
+        self._steps_list.setUpdatesEnabled(True)
         if self._steps:
             self._steps_list.setCurrentRow(0)
             self._update_step_label()
 
-        row_height = self._steps_list.sizeHintForRow(0)
-        if row_height <= 0:
-            row_height = 24
+        # Estimated from the font and check indicator instead of sizeHintForRow, which
+        # forces a synchronous layout of the list.
+        text_height = QtGui.QFontMetrics(self._steps_list.font()).height()
+        indicator_height = self._steps_list.style().pixelMetric(QtWidgets.QStyle.PM_IndicatorHeight)
+        row_height = max(text_height, indicator_height) + 6 + 2 * self._steps_list.spacing()
         total_height = row_height * self._steps_list.count() + self._steps_list.frameWidth() * 2
         self._steps_list.setMinimumHeight(total_height)
 
@@ -357,16 +583,6 @@ class MainWindow(QtWidgets.QMainWindow):
         self._current_step_index = row
         self._update_step_label()
 
-    def _on_step_item_changed(self, item: QtWidgets.QListWidgetItem) -> None:
-        if self._updating_steps:
-            return
-        stored = bool(item.data(QtCore.Qt.UserRole + 1))
-        desired = QtCore.Qt.Checked if stored else QtCore.Qt.Unchecked
-        if item.checkState() != desired:
-            self._updating_steps = True
-            item.setCheckState(desired)
-            self._updating_steps = False
-
     def _update_step_label(self) -> None:
         if not self._steps:
             self._step_label.setText("No steps")
@@ -377,14 +593,21 @@ class MainWindow(QtWidgets.QMainWindow):
     def _go_next_step(self) -> None:
         if not self._steps:
             return
-        next_index = min(self._current_step_index + 1, len(self._steps) - 1)
-        self._steps_list.setCurrentRow(next_index)
+        self._select_step(min(self._current_step_index + 1, len(self._steps) - 1))
 
     def _go_prev_step(self) -> None:
         if not self._steps:
             return
-        prev_index = max(self._current_step_index - 1, 0)
-        self._steps_list.setCurrentRow(prev_index)
+        self._select_step(max(self._current_step_index - 1, 0))
+
+    def _select_step(self, index: int) -> None:
+        if index == self._current_step_index:
+            return
+        self._steps_list.blockSignals(True)
+        self._steps_list.setCurrentRow(index)
+        self._steps_list.blockSignals(False)
+        self._current_step_index = index
+        self._update_step_label()
 
     def _setup_shortcuts(self) -> None:
         QtGui.QShortcut(QtCore.Qt.Key_Space, self, self._go_next_step)
@@ -401,24 +624,48 @@ class MainWindow(QtWidgets.QMainWindow):
     def _calculate_regions(self) -> None:
         if self._polydata is None or self._mesh_mapper is None:
             return
-        segment_ids, error_message, debug_points = compute_segment_ids(
-            self._polydata,
-            self._landmarks,
-            self._geodesic_lines,
-        )
-        if error_message:
-            self._set_error_message(error_message)
-        else:
-            self._set_error_message("")
-        self._last_segment_ids = segment_ids
-        self._last_segment_error = error_message
-        self._show_failure_debug(debug_points)
-        if segment_ids is None:
+        with self._suspend_render():
+            if self._geo_timer.isActive():
+                self._flush_geodesic_updates()
+            segment_ids, error_message, debug_points = compute_segment_ids(
+                self._polydata,
+                self._landmarks,
+                self._geodesic_lines,
+            )
+            if error_message:
+                self._set_error_message(error_message)
+            else:
+                self._set_error_message("")
+            self._last_segment_ids = segment_ids
+            self._last_segment_error = error_message
+            self._show_failure_debug(debug_points)
+            if segment_ids is not None:
+                self._apply_segment_ids(segment_ids)
+                self._append_message("Regions calculated")
+            self._request_render()
+
+    @contextmanager
+    def _suspend_render(self):
+        # Render requests made inside the block collapse into one render when the
+        # outermost block exits.
+        self._render_suspended += 1
+        try:
+            yield
+        finally:
+            self._render_suspended -= 1
+            if self._render_suspended == 0 and self._render_dirty:
+                self._render_dirty = False
+                self._request_render()
+
+    def _request_render(self) -> None:
+        if self._vtk_widget is None:
             return
-        self._apply_segment_ids(segment_ids)
-        self._append_message("Regions calculated")
-        if self._vtk_widget is not None:
-            self._vtk_widget.GetRenderWindow().Render()
+        if self._render_suspended:
+            self._render_dirty = True
+            return
+        if self._dirty_geodesic_widths:
+            self._sync_geodesic_layers()
+        self._vtk_widget.GetRenderWindow().Render()
 
     def _save_results(self) -> None:
         if self._polydata is None or self._overlay_polydata is None:
@@ -505,11 +752,13 @@ class MainWindow(QtWidgets.QMainWindow):
             interactor.GetInteractorStyle().OnLeftButtonDown()
             return
 
-        pick_pos = self._picker.GetPickPosition()
-        if self._point_locator is None:
-            return
-
-        point_id = self._point_locator.FindClosestPoint(pick_pos)
+        point_id = self._picker.GetPointId()
+        if self._picker.GetActor() is not self._mesh_actor or point_id < 0:
+            # Hit an overlay line or landmark; resolve the world position instead.
+            if self._landmark_resolver is None:
+                interactor.GetInteractorStyle().OnLeftButtonDown()
+                return
+            point_id = self._landmark_resolver.closest_ids([self._picker.GetPickPosition()])[0]
         point = self._polydata.GetPoint(point_id)
         self._set_landmark_point(point)
 
@@ -521,60 +770,74 @@ class MainWindow(QtWidgets.QMainWindow):
         step = self._steps[self._current_step_index]
         key = step["key"]
         previous = self._landmarks.get(key)
-        moved = (
-            previous is None
-            or (previous[0] - point[0]) ** 2
-            + (previous[1] - point[1]) ** 2
-            + (previous[2] - point[2]) ** 2
-            > 1.0e-10
-        )
+        moved = previous is None or math.dist(previous, point) > 1.0e-5
         if moved:
             self._landmarks[key] = point
             self._update_landmark_actor(key, point)
         self._mark_step_completed(self._current_step_index)
-        self._update_geodesics({key} if moved else set())
+        if moved:
+            self._pending_geodesic_landmarks.add(key)
+        self._geo_timer.start()
         self._go_next_step()
-        self._vtk_widget.GetRenderWindow().Render()
+        if moved:
+            self._request_render()
 
     def _mark_step_completed(self, index: int) -> None:
-        item = self._steps_list.item(index)
-        if item is None:
-            return
-        self._updating_steps = True
-        item.setData(QtCore.Qt.UserRole + 1, True)
-        item.setCheckState(QtCore.Qt.Checked)
-        self._updating_steps = False
+        self._set_step_completed(index, True)
 
     def _mark_step_incomplete(self, index: int) -> None:
-        item = self._steps_list.item(index)
-        if item is None:
+        self._set_step_completed(index, False)
+
+    def _set_step_completed(self, index: int, completed: bool) -> None:
+        if not 0 <= index < len(self._step_items):
             return
-        self._updating_steps = True
-        item.setData(QtCore.Qt.UserRole + 1, False)
-        item.setCheckState(QtCore.Qt.Unchecked)
-        self._updating_steps = False
+        if self._step_completed[index] == completed:
+            return
+        # _step_completed is the only record of completion; the check state is the
+        # item's single data change, so the list sees one itemChanged per step.
+        item = self._step_items[index]
+        item.setCheckState(QtCore.Qt.Checked if completed else QtCore.Qt.Unchecked)
+        self._step_completed[index] = completed
 
     def _update_landmark_actor(self, key: str, point: tuple[float, float, float]) -> None:
         if self._renderer is None:
             return
-        actor = self._landmark_actors.get(key)
-        if actor is None:
-            sphere = vtkSphereSource()
-            sphere.SetRadius(1.0)
-            sphere.SetThetaResolution(16)
-            sphere.SetPhiResolution(16)
-            sphere.Update()
-
-            mapper = vtkPolyDataMapper()
-            mapper.SetInputConnection(sphere.GetOutputPort())
-
-            actor = vtkActor()
-            actor.SetMapper(mapper)
-            actor.GetProperty().SetColor(1.0, 0.4, 0.2)
-            self._renderer.AddActor(actor)
-            self._landmark_actors[key] = actor
+        if self._landmark_actor is None:
+            mapper = vtkGlyph3DMapper()
+            mapper.SetInputData(self._landmark_polydata)
+            mapper.SetSourceData(_LANDMARK_SPHERE)
+            mapper.ScalingOff()
+            mapper.OrientOff()
+            mapper.SetScalarVisibility(False)
+
+            self._landmark_actor = vtkActor()
+            self._landmark_actor.SetMapper(mapper)
+            self._landmark_actor.SetUseBounds(False)
+            self._landmark_actor.GetProperty().SetColor(1.0, 0.4, 0.2)
+            self._renderer.AddActor(self._landmark_actor)
+
+        index = self._landmark_index.get(key)
+        if index is None:
+            self._landmark_index[key] = self._landmark_points.InsertNextPoint(point)
+            self._landmark_keys.append(key)
+        else:
+            self._landmark_points.SetPoint(index, point)
+        self._landmark_points.Modified()
 
-        actor.SetPosition(point)
+    def _remove_landmark_actor(self, key: str) -> None:
+        index = self._landmark_index.pop(key, None)
+        if index is None:
+            return
+        # Swap-remove: the last landmark takes over the freed slot.
+        last = len(self._landmark_keys) - 1
+        if index != last:
+            moved = self._landmark_keys[last]
+            self._landmark_keys[index] = moved
+            self._landmark_index[moved] = index
+            self._landmark_points.SetPoint(index, self._landmark_points.GetPoint(last))
+        self._landmark_keys.pop()
+        self._landmark_points.SetNumberOfPoints(last)
+        self._landmark_points.Modified()
 
     def _delete_current_landmark(self) -> None:
         if not self._steps:
@@ -585,73 +848,42 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         self._landmarks.pop(key, None)
 
-        actor = self._landmark_actors.pop(key, None)
-        if actor is not None and self._renderer is not None:
-            self._renderer.RemoveActor(actor)
+        self._remove_landmark_actor(key)
 
         self._remove_dependent_geodesics(key)
         self._mark_step_incomplete(self._current_step_index)
-        if self._vtk_widget is not None:
-            self._vtk_widget.GetRenderWindow().Render()
+        self._request_render()
 
     def _remove_dependent_geodesics(self, landmark_key: str) -> None:
-        dependencies = (
-            ("AB_anterior", {"A", "B", "C", "E"}),
-            ("AB_posterior", {"A", "B", "C", "E"}),
-            ("CD_anterior", {"A", "C", "D", "E"}),
-            ("CD_posterior", {"A", "C", "D", "E"}),
-            ("AC", {"A", "C"}),
-            ("BD", {"B", "D"}),
-            ("CE", {"C", "E"}),
-            ("BH", {"B", "H"}),
-            ("DI", {"D", "I"}),
-            ("LAA1_LAA2_anterior", {"LAA1", "LAA2", "D", "F"}),
-            ("LAA1_LAA2_posterior", {"LAA1", "LAA2", "D", "F"}),
-            ("X1_X2", {"X1", "X2"}),
-            ("X2_X3", {"X2", "X3"}),
-            ("X3_X1", {"X3", "X1"}),
-            ("EF_aniso", {"E", "F", "H", "I"}),
-            ("FH_aniso", {"E", "F", "H", "I"}),
-            ("HI_aniso", {"E", "F", "H", "I"}),
-            ("IE_aniso", {"E", "F", "H", "I"}),
-        )
-        for geodesic_key, required in dependencies:
+        for geodesic_key, required in self._GEODESIC_DEPENDENCIES.items():
             if landmark_key in required:
                 self._remove_geodesic(geodesic_key)
 
+    def _flush_geodesic_updates(self) -> None:
+        self._geo_timer.stop()
+        # Edits made while a mesh is loading stay pending until its locator arrives.
+        if self._polydata is None or self._geo_locator is None or self._renderer is None:
+            return
+        changed = self._pending_geodesic_landmarks
+        self._pending_geodesic_landmarks = set()
+        self._update_geodesics(changed)
+
     def _update_geodesics(self, changed_landmarks: set[str] | None = None) -> None:
         if self._polydata is None or self._geo_locator is None or self._renderer is None:
             return
         if changed_landmarks is None:
             changed_landmarks = set(self._landmarks.keys())
         changed_geodesics: set[str] = set()
-        required_pairs = {"A", "B", "C", "D", "E"}
-        if required_pairs.issubset(self._landmarks.keys()):
-            ab_missing = not {"AB_anterior", "AB_posterior"}.issubset(self._geodesic_lines.keys())
-            cd_missing = not {"CD_anterior", "CD_posterior"}.issubset(self._geodesic_lines.keys())
-            ab_changed = bool({"A", "B"} & changed_landmarks) or ab_missing
-            cd_changed = bool({"C", "D"} & changed_landmarks) or cd_missing
-            ab_ok = True
-            cd_ok = True
-            if ab_changed:
-                updated, ab_ok = self._update_landmark_pair_geodesics(
-                    "A",
-                    "B",
-                    ("A", "B", "C"),
-                    "AB",
-                    primary_color=(0.9, 0.6, 0.1),
-                    alternate_color=(0.2, 0.7, 0.2),
-                    line_width=6.0,
-                    anterior_ref_key="E",
-                    plane_origin_key="A",
-                )
-                changed_geodesics.update(updated)
-            if cd_changed:
-                updated, cd_ok = self._update_landmark_pair_geodesics(
-                    "C",
-                    "D",
-                    ("A", "C", "D"),
-                    "CD",
+        if self._AB_CD_REQUIRED <= self._landmarks.keys():
+            pair_ok = []
+            for name_prefix, start_key, end_key, plane_keys, trigger, lines in self._AB_CD_PAIRS:
+                if trigger.isdisjoint(changed_landmarks) and lines <= self._geodesic_lines.keys():
+                    continue
+                updated, ok = self._update_landmark_pair_geodesics(
+                    start_key,
+                    end_key,
+                    plane_keys,
+                    name_prefix,
                     primary_color=(0.9, 0.6, 0.1),
                     alternate_color=(0.2, 0.7, 0.2),
                     line_width=6.0,
@@ -659,59 +891,26 @@ class MainWindow(QtWidgets.QMainWindow):
                     plane_origin_key="A",
                 )
                 changed_geodesics.update(updated)
-            if ab_changed and cd_changed and ab_ok and cd_ok:
+                pair_ok.append(ok)
+            if len(pair_ok) == len(self._AB_CD_PAIRS) and all(pair_ok):
                 self._append_message("AB/CD geodesics updated")
 
-        if (
-            "A" in self._landmarks
-            and "C" in self._landmarks
-            and ({"A", "C"} & changed_landmarks or "AC" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("AC", "A", "C", (0.2, 0.8, 1.0), 6.0):
-                changed_geodesics.add("AC")
-
-        if (
-            "B" in self._landmarks
-            and "D" in self._landmarks
-            and ({"B", "D"} & changed_landmarks or "BD" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("BD", "B", "D", (0.2, 0.8, 1.0), 6.0):
-                changed_geodesics.add("BD")
-
-        if (
-            "C" in self._landmarks
-            and "E" in self._landmarks
-            and ({"C", "E"} & changed_landmarks or "CE" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("CE", "C", "E", (0.7, 0.9, 0.3), 6.0):
-                changed_geodesics.add("CE")
-
-        if (
-            "B" in self._landmarks
-            and "H" in self._landmarks
-            and ({"B", "H"} & changed_landmarks or "BH" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("BH", "B", "H", (0.7, 0.9, 0.3), 6.0):
-                changed_geodesics.add("BH")
-
-        if (
-            "D" in self._landmarks
-            and "I" in self._landmarks
-            and ({"D", "I"} & changed_landmarks or "DI" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("DI", "D", "I", (0.7, 0.9, 0.3), 6.0):
-                changed_geodesics.add("DI")
+        for key, start_key, end_key, color in self._SIMPLE_GEODESICS:
+            if start_key not in self._landmarks or end_key not in self._landmarks:
+                continue
+            if (
+                start_key in changed_landmarks
+                or end_key in changed_landmarks
+                or key not in self._geodesic_lines
+            ):
+                if self._update_simple_geodesic(key, start_key, end_key, color, 6.0):
+                    changed_geodesics.add(key)
 
         if (
-            "LAA1" in self._landmarks
-            and "LAA2" in self._landmarks
-            and "D" in self._landmarks
-            and "F" in self._landmarks
+            self._LAA_KEYS <= self._landmarks.keys()
             and (
-                {"LAA1", "LAA2", "D", "F"} & changed_landmarks
-                or not {"LAA1_LAA2_anterior", "LAA1_LAA2_posterior"}.issubset(
-                    self._geodesic_lines.keys()
-                )
+                not self._LAA_DERIVED_KEYS.isdisjoint(changed_landmarks)
+                or not self._LAA_LINES <= self._geodesic_lines.keys()
             )
         ):
             updated, ok = self._update_landmark_pair_geodesics(
@@ -735,22 +934,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 posterior_line = self._geodesic_lines["LAA1_LAA2_posterior"]
                 point_a = self._landmarks["A"]
                 
-                # Find closest point on the posterior geodesic to point A
-                closest_point = None
-                min_distance_sq = float("inf")
-                
-                points = posterior_line.GetPoints()
-                for i in range(points.GetNumberOfPoints()):
-                    point = points.GetPoint(i)
-                    dx = point[0] - point_a[0]
-                    dy = point[1] - point_a[1]
-                    dz = point[2] - point_a[2]
-                    dist_sq = dx * dx + dy * dy + dz * dz
-                    
-                    if dist_sq < min_distance_sq:
-                        min_distance_sq = dist_sq
-                        closest_point = point
-                
+                closest_point = self._closest_line_point(posterior_line, point_a)
                 if closest_point is not None:
                     # Store as LAA3 landmark
                     self._landmarks["LAA3"] = closest_point
@@ -765,22 +949,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 anterior_line = self._geodesic_lines["LAA1_LAA2_anterior"]
                 point_f = self._landmarks["F"]
                 
-                # Find closest point on the anterior geodesic to point F
-                closest_point = None
-                min_distance_sq = float("inf")
-                
-                points = anterior_line.GetPoints()
-                for i in range(points.GetNumberOfPoints()):
-                    point = points.GetPoint(i)
-                    dx = point[0] - point_f[0]
-                    dy = point[1] - point_f[1]
-                    dz = point[2] - point_f[2]
-                    dist_sq = dx * dx + dy * dy + dz * dz
-                    
-                    if dist_sq < min_distance_sq:
-                        min_distance_sq = dist_sq
-                        closest_point = point
-                
+                closest_point = self._closest_line_point(anterior_line, point_f)
                 if closest_point is not None:
                     # Store as LAA4 landmark
                     self._landmarks["LAA4"] = closest_point
@@ -796,162 +965,47 @@ class MainWindow(QtWidgets.QMainWindow):
                 if self._update_simple_geodesic("F_LAA4", "F", "LAA4", (1.0, 0.5, 0.0), 5.0):
                     changed_geodesics.add("F_LAA4")
 
-# A1=A2
-        if (
-            "A1" in self._landmarks
-            and "A2" in self._landmarks
-            and "D" in self._landmarks
-            and "F" in self._landmarks
-            and (
-                {"A1", "A2", "D", "F"} & changed_landmarks
-                or not {"A1_A2_anterior", "A1_A2_posterior"}.issubset(
-                    self._geodesic_lines.keys()
-                )
-            )
-        ):
-            updated, ok = self._update_landmark_pair_geodesics(
-                "A1",
-                "A2",
-                ("A1", "A2", "D"),
-                "A1_A2",
-                primary_color=(0.9, 0.6, 0.1),
-                alternate_color=(0.2, 0.7, 0.2),
-                line_width=6.0,
-                anterior_ref_key="F",
-                plane_origin_key="D",
-            )
-            changed_geodesics.update(updated)
-
-# B1=B2
-        if (
-            "B1" in self._landmarks
-            and "B2" in self._landmarks
-            and "D" in self._landmarks
-            and "F" in self._landmarks
-            and (
-                {"B1", "B2", "D", "F"} & changed_landmarks
-                or not {"B1_B2_anterior", "B1_B2_posterior"}.issubset(
-                    self._geodesic_lines.keys()
-                )
-            )
-        ):
-            updated, ok = self._update_landmark_pair_geodesics(
-                "B1",
-                "B2",
-                ("B1", "B2", "D"),
-                "B1_B2",
-                primary_color=(0.9, 0.6, 0.1),
-                alternate_color=(0.2, 0.7, 0.2),
-                line_width=6.0,
-                anterior_ref_key="F",
-                plane_origin_key="D",
-            )
-            changed_geodesics.update(updated)            
-
-# C1=C2
-        if (
-            "C1" in self._landmarks
-            and "C2" in self._landmarks
-            and "A" in self._landmarks
-            and "E" in self._landmarks
-            and (
-                {"C1", "C2", "A", "E"} & changed_landmarks
-                or not {"C1_C2_anterior", "C1_C2_posterior"}.issubset(
-                    self._geodesic_lines.keys()
-                )
-            )
-        ):
-            updated, ok = self._update_landmark_pair_geodesics(
-                "C1",
-                "C2",
-                ("C1", "C2", "A"),
-                "C1_C2",
-                primary_color=(0.9, 0.6, 0.1),
-                alternate_color=(0.2, 0.7, 0.2),
-                line_width=6.0,
-                anterior_ref_key="E",
-                plane_origin_key="A",
-            )
-            changed_geodesics.update(updated)
-
-# D1=D2
-        if (
-            "D1" in self._landmarks
-            and "D2" in self._landmarks
-            and "A" in self._landmarks
-            and "E" in self._landmarks
-            and (
-                {"D1", "D2", "A", "E"} & changed_landmarks
-                or not {"D1_D2_anterior", "D1_D2_posterior"}.issubset(
-                    self._geodesic_lines.keys()
-                )
-            )
-        ):
-            updated, ok = self._update_landmark_pair_geodesics(
-                "D1",
-                "D2",
-                ("D1", "D2", "A"),
-                "D1_D2",
+        for name_prefix, start_key, end_key, plane_key, ref_key, origin_key in self._PAIR_GEODESICS:
+            required = (start_key, end_key, ref_key, origin_key)
+            if not all(key in self._landmarks for key in required):
+                continue
+            if (
+                changed_landmarks.isdisjoint(required)
+                and f"{name_prefix}_anterior" in self._geodesic_lines
+                and f"{name_prefix}_posterior" in self._geodesic_lines
+            ):
+                continue
+            updated, _ok = self._update_landmark_pair_geodesics(
+                start_key,
+                end_key,
+                (start_key, end_key, plane_key),
+                name_prefix,
                 primary_color=(0.9, 0.6, 0.1),
                 alternate_color=(0.2, 0.7, 0.2),
                 line_width=6.0,
-                anterior_ref_key="E",
-                plane_origin_key="A",
+                anterior_ref_key=ref_key,
+                plane_origin_key=origin_key,
             )
             changed_geodesics.update(updated)
 
-        if (
-            "X1" in self._landmarks
-            and "X2" in self._landmarks
-            and ({"X1", "X2"} & changed_landmarks or "X1_X2" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("X1_X2", "X1", "X2", (0.8, 0.8, 0.2), 6.0):
-                changed_geodesics.add("X1_X2")
-
-        if (
-            "X2" in self._landmarks
-            and "X3" in self._landmarks
-            and ({"X2", "X3"} & changed_landmarks or "X2_X3" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("X2_X3", "X2", "X3", (0.8, 0.8, 0.2), 6.0):
-                changed_geodesics.add("X2_X3")
-
-        if (
-            "X3" in self._landmarks
-            and "X1" in self._landmarks
-            and ({"X3", "X1"} & changed_landmarks or "X3_X1" not in self._geodesic_lines)
-        ):
-            if self._update_simple_geodesic("X3_X1", "X3", "X1", (0.8, 0.8, 0.2), 6.0):
-                changed_geodesics.add("X3_X1")
-
-        has_ma_points = {"E", "F", "H", "I"}.issubset(self._landmarks.keys())
+        has_ma_points = self._MA_KEYS <= self._landmarks.keys()
         if not has_ma_points:
-            for key in ("EF_aniso", "FH_aniso", "HI_aniso", "IE_aniso"):
+            for key in self._MA_LINES:
                 self._remove_geodesic(key)
         elif (
-            {"E", "F", "H", "I"} & changed_landmarks
-            or not {"EF_aniso", "FH_aniso", "HI_aniso", "IE_aniso"}.issubset(
-                self._geodesic_lines.keys()
-            )
+            not self._MA_KEYS.isdisjoint(changed_landmarks)
+            or not all(key in self._geodesic_lines for key in self._MA_LINES)
         ):
-            ma_normal = compute_ma_plane_normal(
-                self._landmarks["E"],
-                self._landmarks["F"],
-                self._landmarks["H"],
-                self._landmarks["I"],
-            )
+            ma_key = tuple(self._landmarks[key] for key in ("E", "F", "H", "I"))
+            if ma_key != self._ma_normal_key:
+                self._ma_normal = compute_ma_plane_normal(*ma_key)
+                self._ma_normal_key = ma_key
+            ma_normal = self._ma_normal
             if ma_normal is None:
-                for key in ("EF_aniso", "FH_aniso", "HI_aniso", "IE_aniso"):
+                for key in self._MA_LINES:
                     self._remove_geodesic(key)
             else:
-                penalty_strength = 2.0
-                aniso_specs = (
-                    ("EF_aniso", "E", "F", (0.9, 0.2, 0.2)),
-                    ("FH_aniso", "F", "H", (0.2, 0.9, 0.2)),
-                    ("HI_aniso", "H", "I", (0.2, 0.2, 0.9)),
-                    ("IE_aniso", "I", "E", (0.9, 0.7, 0.2)),
-                )
-                for key, start_key, end_key, color in aniso_specs:
+                for key, start_key, end_key, color in self._MA_GEODESICS:
                     self._remove_geodesic(key)
                     result = create_anisotropic_geodesic(
                         self._polydata,
@@ -960,16 +1014,24 @@ class MainWindow(QtWidgets.QMainWindow):
                         start_key,
                         end_key,
                         ma_normal,
-                        penalty_strength,
+                        self._MA_PENALTY,
                     )
                     if result is not None:
                         self._store_geodesic_actor(key, result.polyline, color, 4.0)
                         changed_geodesics.add(key)
                         self._append_message(f"Geodesic {key} updated")
 
-        self._vtk_widget.GetRenderWindow().Render()
+        self._request_render()
 
 
+    @staticmethod
+    def _closest_line_point(polyline, point: tuple[float, float, float]) -> tuple[float, float, float] | None:
+        points = polyline.GetPoints()
+        if points is None:
+            return None
+        index = nearest_point_index(vtk_to_numpy(points.GetData()), np.asarray(point, dtype=np.float64))
+        return points.GetPoint(index) if index >= 0 else None
+
     def _update_landmark_pair_geodesics(
         self,
         start_key: str,
@@ -985,6 +1047,15 @@ class MainWindow(QtWidgets.QMainWindow):
         updated: set[str] = set()
         anterior_key = f"{name_prefix}_anterior"
         posterior_key = f"{name_prefix}_posterior"
+        inputs = tuple(
+            self._landmarks[key]
+            for key in (start_key, end_key, *plane_keys, anterior_ref_key, plane_origin_key)
+        )
+        if (
+            self._geodesic_inputs.get(anterior_key) == inputs
+            and self._geodesic_inputs.get(posterior_key) == inputs
+        ):
+            return updated, True
         self._remove_geodesic(anterior_key)
         self._remove_geodesic(posterior_key)
 
@@ -1016,6 +1087,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self._store_geodesic_actor(resolved_alternate, alternate.polyline, alternate_color, line_width)
         self._append_message(f"Geodesic {resolved_alternate} updated")
         updated.add(resolved_alternate)
+        self._geodesic_inputs[anterior_key] = inputs
+        self._geodesic_inputs[posterior_key] = inputs
         return updated, True
 
     def _store_geodesic_actor(
@@ -1025,17 +1098,54 @@ class MainWindow(QtWidgets.QMainWindow):
         color: tuple[float, float, float],
         line_width: float,
     ) -> None:
-        mapper = vtkPolyDataMapper()
-        mapper.SetInputData(polyline)
-
-        actor = vtkActor()
-        actor.SetMapper(mapper)
-        actor.GetProperty().SetColor(*color)
-        actor.GetProperty().SetLineWidth(line_width)
-        self._renderer.AddActor(actor)
-        self._geodesic_actors[key] = actor
+        previous = self._geodesic_styles.get(key)
+        if previous is not None:
+            self._dirty_geodesic_widths.add(previous[1])
+        self._geodesic_styles[key] = (color, line_width)
+        self._dirty_geodesic_widths.add(line_width)
         self._geodesic_lines[key] = polyline
 
+    def _sync_geodesic_layers(self) -> None:
+        # All geodesics of one line width are drawn by a single actor whose polydata
+        # appends their polylines, coloured per cell. Layers are rebuilt only when a
+        # geodesic of that width changed, and are hidden rather than removed.
+        for line_width in self._dirty_geodesic_widths:
+            actor = self._geodesic_layers.get(line_width)
+            if actor is None:
+                mapper = vtkPolyDataMapper()
+                mapper.SetScalarModeToUseCellData()
+                mapper.SetColorModeToDirectScalars()
+                mapper.StaticOn()
+                actor = vtkActor()
+                actor.SetMapper(mapper)
+                actor.SetUseBounds(False)
+                actor.GetProperty().SetLineWidth(line_width)
+                self._renderer.AddActor(actor)
+                self._geodesic_layers[line_width] = actor
+
+            keys = [key for key, (_color, width) in self._geodesic_styles.items() if width == line_width]
+            if not keys:
+                actor.SetVisibility(0)
+                continue
+
+            append = vtkAppendPolyData()
+            colors = vtkUnsignedCharArray()
+            colors.SetName("Colors")
+            colors.SetNumberOfComponents(3)
+            for key in keys:
+                polyline = self._geodesic_lines[key]
+                append.AddInputData(polyline)
+                rgb = [int(round(channel * 255.0)) for channel in self._geodesic_styles[key][0]]
+                for _ in range(polyline.GetNumberOfCells()):
+                    colors.InsertNextTuple3(*rgb)
+            append.Update()
+            merged = vtkPolyData()
+            merged.ShallowCopy(append.GetOutput())
+            merged.GetCellData().SetScalars(colors)
+            actor.GetMapper().SetInputData(merged)
+            actor.SetVisibility(1)
+        self._dirty_geodesic_widths.clear()
+
     def _store_aux_actor(
         self,
         key: str,
@@ -1050,6 +1160,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if actor is None:
             actor = vtkActor()
             actor.SetMapper(mapper)
+            actor.SetUseBounds(False)
             actor.GetProperty().SetColor(*color)
             actor.GetProperty().SetLineWidth(line_width)
             self._renderer.AddActor(actor)
@@ -1072,16 +1183,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self._remove_aux_actor(key)
             return
 
-        points = vtkPoints()
-        verts = vtkCellArray()
-        for idx, point_id in enumerate(point_ids):
-            points.InsertNextPoint(self._polydata.GetPoint(point_id))
-            verts.InsertNextCell(1)
-            verts.InsertCellPoint(idx)
-
-        poly = vtkPolyData()
-        poly.SetPoints(points)
-        poly.SetVerts(verts)
+        poly = vertex_cloud(self._polydata, point_ids)
 
         mapper = vtkPolyDataMapper()
         mapper.SetInputData(poly)
@@ -1090,6 +1192,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if actor is None:
             actor = vtkActor()
             actor.SetMapper(mapper)
+            actor.SetUseBounds(False)
             actor.GetProperty().SetColor(*color)
             actor.GetProperty().SetRepresentationToPoints()
             actor.GetProperty().SetRenderPointsAsSpheres(True)
@@ -1183,48 +1286,50 @@ class MainWindow(QtWidgets.QMainWindow):
         color: tuple[float, float, float],
         line_width: float,
     ) -> bool:
+        # Inputs are the endpoint positions the stored line was computed from; an
+        # unchanged pair keeps its line and does not count as updated.
+        inputs = (self._landmarks[start_key], self._landmarks[end_key])
+        if self._geodesic_inputs.get(key) == inputs:
+            return False
         self._remove_geodesic(key)
         self._create_simple_geodesic(key, start_key, end_key, color, line_width)
-        return key in self._geodesic_lines
+        if key not in self._geodesic_lines:
+            return False
+        self._geodesic_inputs[key] = inputs
+        return True
 
     def _remove_geodesic(self, key: str) -> None:
-        actor = self._geodesic_actors.pop(key, None)
-        if actor is not None:
-            self._renderer.RemoveActor(actor)
+        style = self._geodesic_styles.pop(key, None)
+        if style is not None:
+            self._dirty_geodesic_widths.add(style[1])
         self._geodesic_lines.pop(key, None)
+        self._geodesic_inputs.pop(key, None)
 
     def _build_segment_lut(self) -> vtkLookupTable:
+        rgba = np.full((len(_SEGMENT_PALETTE), 4), 255, dtype=np.uint8)
+        rgba[:, :3] = np.floor(np.asarray(_SEGMENT_PALETTE) * 255.0 + 0.5)
         lut = vtkLookupTable()
-        lut.SetNumberOfTableValues(10)
-        lut.Build()
-        lut.SetTableValue(0, 0.6, 0.6, 0.6, 1.0)
-        lut.SetTableValue(1, 0.89, 0.10, 0.11, 1.0)
-        lut.SetTableValue(2, 0.22, 0.49, 0.72, 1.0)
-        lut.SetTableValue(3, 0.30, 0.69, 0.29, 1.0)
-        lut.SetTableValue(4, 0.60, 0.31, 0.64, 1.0)
-        lut.SetTableValue(5, 1.00, 0.50, 0.00, 1.0)
-        lut.SetTableValue(6, 0.65, 0.34, 0.16, 1.0)
-        lut.SetTableValue(7, 0.97, 0.51, 0.75, 1.0)
-        lut.SetTableValue(8, 0.0, 1.0, 0.0, 1.0)
-        lut.SetTableValue(9, 0.45, 0.45, 0.45, 1.0)
+        lut.SetTable(numpy_to_vtk(rgba, deep=1))
         return lut
 
+    def _set_unassigned_color(self, rgb: tuple[float, float, float]) -> None:
+        # SetTableValue bumps the LUT mtime and with it the mapper's colour buffers,
+        # so the entry is only written when it actually changes.
+        if self._segment_lut.GetTableValue(0)[:3] != tuple(int(c * 255.0 + 0.5) / 255.0 for c in rgb):
+            self._segment_lut.SetTableValue(0, *rgb, 1.0)
+
     def _apply_segment_ids(self, segment_ids) -> None:
         point_data = self._polydata.GetPointData()
         point_data.AddArray(segment_ids)
         point_data.SetScalars(segment_ids)
         self._mesh_mapper.SetScalarRange(0, 9)
 
-        required_keys = {"A", "B", "C", "D", "E", "F", "H", "I", "LAA1", "LAA2"}
-        if required_keys.issubset(self._landmarks.keys()):
-            unassigned = 0
-            for i in range(segment_ids.GetNumberOfTuples()):
-                if segment_ids.GetValue(i) == 0:
-                    unassigned += 1
-            self._segment_lut.SetTableValue(0, 1.0, 1.0, 1.0, 1.0)
+        if self._SEGMENTED_REQUIRED <= self._landmarks.keys():
+            unassigned = int(np.count_nonzero(vtk_to_numpy(segment_ids) == 0))
+            self._set_unassigned_color((1.0, 1.0, 1.0))
             self.statusBar().showMessage(f"Unassigned vertices: {unassigned}")
         else:
-            self._segment_lut.SetTableValue(0, 0.6, 0.6, 0.6, 1.0)
+            self._set_unassigned_color(_SEGMENT_PALETTE[0])
             self.statusBar().showMessage("")
 
 
@@ -1248,7 +1353,7 @@ def main() -> None:
             None,
             "Open VTK Mesh",
             "",
-            "VTK Files (*.vtk)",
+            "VTK Files (*.vtk *.vtp)",
             options=options,
         )
         if not input_file:
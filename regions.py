@@ -1,47 +1,32 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Iterable, Sequence
+from typing import Sequence
 
-from vtkmodules.vtkCommonCore import vtkIdList, vtkIntArray
-from vtkmodules.vtkCommonDataModel import vtkPolyData
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkCommonCore import vtkIntArray, vtkPoints
+from vtkmodules.vtkCommonDataModel import vtkCellArray, vtkPolyData
 
-from geodesics import build_point_locator
+from geodesics import LandmarkResolver, build_landmark_resolver, get_csr_adjacency, polyline_midpoint
 
 
-def _build_point_adjacency(surface: vtkPolyData) -> list[set[int]]:
-    adjacency: list[set[int]] = [set() for _ in range(surface.GetNumberOfPoints())]
+def _build_point_adjacency(surface: vtkPolyData) -> tuple[np.ndarray, np.ndarray]:
+    indptr, indices, _coords = get_csr_adjacency(surface)
+    return indptr, indices
 
-    def add_cell(ids: Iterable[int]) -> None:
-        ids_list = list(ids)
-        count = len(ids_list)
-        for i in range(count):
-            a = ids_list[i]
-            for j in range(i + 1, count):
-                b = ids_list[j]
-                adjacency[a].add(b)
-                adjacency[b].add(a)
 
-    polys = surface.GetPolys()
-    polys.InitTraversal()
-    id_list = vtkIdList()
-    while polys.GetNextCell(id_list):
-        if id_list.GetNumberOfIds() >= 2:
-            add_cell(id_list.GetId(i) for i in range(id_list.GetNumberOfIds()))
-
-    strips = surface.GetStrips()
-    strips.InitTraversal()
-    id_list.Reset()
-    while strips.GetNextCell(id_list):
-        if id_list.GetNumberOfIds() >= 2:
-            add_cell(id_list.GetId(i) for i in range(id_list.GetNumberOfIds()))
-
-    return adjacency
+def _id_mask(num_points: int, ids: set[int]) -> np.ndarray:
+    mask = np.zeros(num_points, dtype=bool)
+    mask[np.fromiter(ids, dtype=np.int64, count=len(ids))] = True
+    return mask
 
 
 def _find_non_boundary_seed(
     start_id: int,
-    adjacency: list[set[int]],
+    adjacency: tuple[np.ndarray, np.ndarray],
     boundary_ids: set[int],
     blocked_ids: set[int] | None = None,
 ) -> int | None:
@@ -50,11 +35,12 @@ def _find_non_boundary_seed(
     if start_id not in boundary_ids and start_id not in blocked_ids:
         return start_id
 
+    indptr, indices = adjacency
     visited = {start_id}
     queue: deque[int] = deque([start_id])
     while queue:
         current = queue.popleft()
-        for neighbor in adjacency[current]:
+        for neighbor in indices[indptr[current] : indptr[current + 1]].tolist():
             if neighbor in visited:
                 continue
             visited.add(neighbor)
@@ -67,30 +53,45 @@ def _find_non_boundary_seed(
 
 def _collect_component(
     seed_id: int,
-    adjacency: list[set[int]],
+    adjacency: tuple[np.ndarray, np.ndarray],
     boundary_ids: set[int],
     blocked_ids: set[int] | None = None,
 ) -> set[int]:
-    if blocked_ids is None:
-        blocked_ids = set()
+    # Drop every edge into a boundary or blocked vertex and let SciPy walk what
+    # is left from the seed.
+    indptr, indices = adjacency
+    num_points = indptr.shape[0] - 1
+    closed = _id_mask(num_points, boundary_ids)
+    if blocked_ids:
+        closed |= _id_mask(num_points, blocked_ids)
+    closed[seed_id] = False
+    open_edges = ~closed[indices]
+    open_indptr = np.concatenate(([0], np.cumsum(open_edges)))[indptr]
+    graph = csr_matrix(
+        (np.ones(open_indptr[-1]), indices[open_edges], open_indptr),
+        shape=(num_points, num_points),
+    )
+    return set(breadth_first_order(graph, seed_id, return_predecessors=False).tolist())
 
-    visited: set[int] = set()
-    queue: deque[int] = deque([seed_id])
-    visited.add(seed_id)
-    while queue:
-        current = queue.popleft()
-        for neighbor in adjacency[current]:
-            if neighbor in visited:
-                continue
-            if neighbor in boundary_ids or neighbor in blocked_ids:
-                continue
-            visited.add(neighbor)
-            queue.append(neighbor)
-    return visited
+
+def _polyline_boundary_ids(resolver: LandmarkResolver, points: vtkPoints, lines: vtkCellArray) -> set[int]:
+    # Every segment contributes its two ends plus the points at 1/3 and 2/3, so
+    # the boundary has no gaps where the polyline is coarser than the mesh.
+    offsets = vtk_to_numpy(lines.GetOffsetsArray()).astype(np.int64)
+    connectivity = vtk_to_numpy(lines.GetConnectivityArray()).astype(np.int64)
+    if connectivity.size == 0:
+        return set()
+    remaining = np.repeat(offsets[1:], np.diff(offsets)) - np.arange(connectivity.size) - 1
+    heads = np.flatnonzero(remaining >= 1)
+    coords = vtk_to_numpy(points.GetData()).reshape(-1, 3).astype(np.float64)
+    p0 = coords[connectivity[heads]]
+    p1 = coords[connectivity[heads + 1]]
+    samples = np.concatenate([p0, p1, p0 + (p1 - p0) * (1.0 / 3.0), p0 + (p1 - p0) * (2.0 / 3.0)])
+    return set(resolver.nearest(samples).tolist())
 
 
 def _collect_boundary_ids(
-    locator,
+    resolver: LandmarkResolver,
     landmarks: dict[str, Sequence[float]],
     geodesic_lines: dict[str, vtkPolyData],
     boundary_keys: Sequence[str],
@@ -106,36 +107,15 @@ def _collect_boundary_ids(
         lines = polyline.GetLines()
         if lines is None:
             return None
-        lines.InitTraversal()
-        id_list = vtkIdList()
-        while lines.GetNextCell(id_list):
-            if id_list.GetNumberOfIds() < 2:
-                continue
-            for i in range(1, id_list.GetNumberOfIds()):
-                p0 = points.GetPoint(id_list.GetId(i - 1))
-                p1 = points.GetPoint(id_list.GetId(i))
-                boundary_ids.add(locator.FindClosestPoint(p0))
-                boundary_ids.add(locator.FindClosestPoint(p1))
-                mid1 = (
-                    p0[0] + (p1[0] - p0[0]) * (1.0 / 3.0),
-                    p0[1] + (p1[1] - p0[1]) * (1.0 / 3.0),
-                    p0[2] + (p1[2] - p0[2]) * (1.0 / 3.0),
-                )
-                mid2 = (
-                    p0[0] + (p1[0] - p0[0]) * (2.0 / 3.0),
-                    p0[1] + (p1[1] - p0[1]) * (2.0 / 3.0),
-                    p0[2] + (p1[2] - p0[2]) * (2.0 / 3.0),
-                )
-                boundary_ids.add(locator.FindClosestPoint(mid1))
-                boundary_ids.add(locator.FindClosestPoint(mid2))
+        boundary_ids.update(_polyline_boundary_ids(resolver, points, lines))
 
     return boundary_ids
 
 
 def _collect_segment_component(
     surface: vtkPolyData,
-    adjacency: list[set[int]],
-    locator,
+    adjacency: tuple[np.ndarray, np.ndarray],
+    resolver: LandmarkResolver,
     landmarks: dict[str, Sequence[float]],
     geodesic_lines: dict[str, vtkPolyData],
     boundary_keys: Sequence[str],
@@ -144,13 +124,12 @@ def _collect_segment_component(
     blocked_ids: set[int] | None = None,
     seed_point: Sequence[float] | None = None,
 ) -> set[int] | None:
-    boundary_ids = _collect_boundary_ids(locator, landmarks, geodesic_lines, boundary_keys)
+    boundary_ids = _collect_boundary_ids(resolver, landmarks, geodesic_lines, boundary_keys)
     if boundary_ids is None:
         return None
 
-    opposite_id = locator.FindClosestPoint(landmarks[opposite_key])
     seed_source = seed_point if seed_point is not None else landmarks[seed_key]
-    seed_id = locator.FindClosestPoint(seed_source)
+    opposite_id, seed_id = resolver.closest_ids((landmarks[opposite_key], seed_source))
 
     opposite_seed = _find_non_boundary_seed(opposite_id, adjacency, boundary_ids)
     if opposite_seed is None:
@@ -175,8 +154,8 @@ def _collect_segment_component(
 
 def _diagnose_segment_failure(
     segment_id: int,
-    adjacency: list[set[int]],
-    locator,
+    adjacency: tuple[np.ndarray, np.ndarray],
+    resolver: LandmarkResolver,
     landmarks: dict[str, Sequence[float]],
     geodesic_lines: dict[str, vtkPolyData],
     boundary_keys: Sequence[str],
@@ -185,13 +164,12 @@ def _diagnose_segment_failure(
     blocked_ids: set[int] | None = None,
     seed_point: Sequence[float] | None = None,
 ) -> str:
-    boundary_ids = _collect_boundary_ids(locator, landmarks, geodesic_lines, boundary_keys)
+    boundary_ids = _collect_boundary_ids(resolver, landmarks, geodesic_lines, boundary_keys)
     if boundary_ids is None:
         return f"Segment {segment_id} failed: missing boundary polyline"
 
-    opposite_id = locator.FindClosestPoint(landmarks[opposite_key])
     seed_source = seed_point if seed_point is not None else landmarks[seed_key]
-    seed_id = locator.FindClosestPoint(seed_source)
+    opposite_id, seed_id = resolver.closest_ids((landmarks[opposite_key], seed_source))
 
     opposite_seed = _find_non_boundary_seed(opposite_id, adjacency, boundary_ids)
     if opposite_seed is None:
@@ -226,8 +204,8 @@ def _diagnose_segment_failure(
 
 
 def _collect_failure_debug(
-    adjacency: list[set[int]],
-    locator,
+    adjacency: tuple[np.ndarray, np.ndarray],
+    resolver: LandmarkResolver,
     landmarks: dict[str, Sequence[float]],
     geodesic_lines: dict[str, vtkPolyData],
     boundary_keys: Sequence[str],
@@ -236,13 +214,12 @@ def _collect_failure_debug(
     blocked_ids: set[int] | None = None,
     seed_point: Sequence[float] | None = None,
 ) -> dict[str, object] | None:
-    boundary_ids = _collect_boundary_ids(locator, landmarks, geodesic_lines, boundary_keys)
+    boundary_ids = _collect_boundary_ids(resolver, landmarks, geodesic_lines, boundary_keys)
     if boundary_ids is None:
         return None
 
-    opposite_id = int(locator.FindClosestPoint(landmarks[opposite_key]))
     seed_source = seed_point if seed_point is not None else landmarks[seed_key]
-    seed_id = int(locator.FindClosestPoint(seed_source))
+    opposite_id, seed_id = resolver.closest_ids((landmarks[opposite_key], seed_source))
 
     opposite_seed = _find_non_boundary_seed(opposite_id, adjacency, boundary_ids)
     if opposite_seed is None:
@@ -250,7 +227,7 @@ def _collect_failure_debug(
             "boundary_ids": list(boundary_ids),
             "boundary_count": len(boundary_ids),
             "blocked_count": None,
-            "total_points": len(adjacency),
+            "total_points": len(adjacency[0]) - 1,
             "seed_id": seed_id,
             "opposite_id": opposite_id,
             "opposite_seed_id": None,
@@ -273,7 +250,7 @@ def _collect_failure_debug(
         "boundary_ids": list(boundary_ids),
         "boundary_count": len(boundary_ids),
         "blocked_count": len(seed_blocked),
-        "total_points": len(adjacency),
+        "total_points": len(adjacency[0]) - 1,
         "seed_id": seed_id,
         "opposite_id": opposite_id,
         "opposite_seed_id": opposite_seed,
@@ -304,16 +281,13 @@ def _seed_fallback_candidates(
 
 def _polyline_midpoint_point(polyline: vtkPolyData) -> tuple[float, float, float] | None:
     points = polyline.GetPoints()
-    if points is None:
+    if points is None or points.GetNumberOfPoints() == 0:
         return None
-    count = points.GetNumberOfPoints()
-    if count == 0:
-        return None
-    return points.GetPoint(count // 2)
+    return polyline_midpoint(polyline)
 
 
 def _collect_available_boundary_ids(
-    locator,
+    resolver: LandmarkResolver,
     geodesic_lines: dict[str, vtkPolyData],
     boundary_keys: Sequence[str],
 ) -> set[int]:
@@ -328,55 +302,33 @@ def _collect_available_boundary_ids(
         lines = polyline.GetLines()
         if lines is None:
             continue
-        lines.InitTraversal()
-        id_list = vtkIdList()
-        while lines.GetNextCell(id_list):
-            if id_list.GetNumberOfIds() < 2:
-                continue
-            for i in range(1, id_list.GetNumberOfIds()):
-                p0 = points.GetPoint(id_list.GetId(i - 1))
-                p1 = points.GetPoint(id_list.GetId(i))
-                boundary_ids.add(locator.FindClosestPoint(p0))
-                boundary_ids.add(locator.FindClosestPoint(p1))
-                mid1 = (
-                    p0[0] + (p1[0] - p0[0]) * (1.0 / 3.0),
-                    p0[1] + (p1[1] - p0[1]) * (1.0 / 3.0),
-                    p0[2] + (p1[2] - p0[2]) * (1.0 / 3.0),
-                )
-                mid2 = (
-                    p0[0] + (p1[0] - p0[0]) * (2.0 / 3.0),
-                    p0[1] + (p1[1] - p0[1]) * (2.0 / 3.0),
-                    p0[2] + (p1[2] - p0[2]) * (2.0 / 3.0),
-                )
-                boundary_ids.add(locator.FindClosestPoint(mid1))
-                boundary_ids.add(locator.FindClosestPoint(mid2))
+        boundary_ids.update(_polyline_boundary_ids(resolver, points, lines))
     return boundary_ids
 
 
 def _assign_boundary_vertices(
     segment_ids: vtkIntArray,
-    adjacency: list[set[int]],
+    adjacency: tuple[np.ndarray, np.ndarray],
     boundary_ids: set[int],
 ) -> None:
+    indptr, indices = adjacency
+    values = vtk_to_numpy(segment_ids)
     for vertex_id in boundary_ids:
-        if segment_ids.GetValue(vertex_id) != 0:
+        if values[vertex_id] != 0:
             continue
-        neighbor_counts: dict[int, int] = {}
-        for neighbor in adjacency[vertex_id]:
-            seg_id = segment_ids.GetValue(neighbor)
-            if seg_id == 0:
-                continue
-            neighbor_counts[seg_id] = neighbor_counts.get(seg_id, 0) + 1
-        if neighbor_counts:
-            best_seg = max(neighbor_counts.items(), key=lambda item: (item[1], -item[0]))[0]
-            segment_ids.SetValue(vertex_id, best_seg)
+        neighbor_segs = values[indices[indptr[vertex_id] : indptr[vertex_id + 1]]]
+        neighbor_segs = neighbor_segs[neighbor_segs != 0]
+        if neighbor_segs.size:
+            # argmax keeps the lowest segment id among equally common neighbours.
+            values[vertex_id] = np.argmax(np.bincount(neighbor_segs))
+    segment_ids.Modified()
 
 
 def _build_segment_ids(
     surface: vtkPolyData,
     segments: dict[int, set[int] | None],
-    adjacency: list[set[int]],
-    locator,
+    adjacency: tuple[np.ndarray, np.ndarray],
+    resolver: LandmarkResolver,
     landmarks: dict[str, Sequence[float]],
     geodesic_lines: dict[str, vtkPolyData],
 ) -> vtkIntArray:
@@ -394,7 +346,7 @@ def _build_segment_ids(
                     segment_ids.SetValue(vertex_id, seg_id)
 
     boundary_ids = _collect_boundary_ids(
-        locator,
+        resolver,
         landmarks,
         geodesic_lines,
         tuple(geodesic_lines.keys()),
@@ -419,7 +371,7 @@ def compute_segment_ids(
         return None, "Missing CD geodesics", None
 
     adjacency = _build_point_adjacency(surface)
-    locator = build_point_locator(surface)
+    resolver = build_landmark_resolver(surface)
     segments: dict[int, set[int] | None] = {}
 
     def compute_segment_with_fallback(
@@ -447,7 +399,7 @@ def compute_segment_ids(
                 else:
                     message = f"Segment {seg_id} skipped: missing boundary geodesics"
                 debug_points = {
-                    "boundary_ids": list(_collect_available_boundary_ids(locator, geodesic_lines, deps)),
+                    "boundary_ids": list(_collect_available_boundary_ids(resolver, geodesic_lines, deps)),
                     "seed_id": None,
                     "opposite_id": None,
                     "seed_candidate_id": None,
@@ -466,7 +418,7 @@ def compute_segment_ids(
         segment = _collect_segment_component(
             surface,
             adjacency,
-            locator,
+            resolver,
             landmarks,
             geodesic_lines,
             deps,
@@ -480,7 +432,7 @@ def compute_segment_ids(
                 segment = _collect_segment_component(
                     surface,
                     adjacency,
-                    locator,
+                    resolver,
                     landmarks,
                     geodesic_lines,
                     deps,
@@ -495,7 +447,7 @@ def compute_segment_ids(
         if segment is None:
             debug_points = _collect_failure_debug(
                 adjacency,
-                locator,
+                resolver,
                 landmarks,
                 geodesic_lines,
                 deps,
@@ -506,7 +458,7 @@ def compute_segment_ids(
             )
             if debug_points is None:
                 debug_points = {
-                    "boundary_ids": list(_collect_available_boundary_ids(locator, geodesic_lines, deps)),
+                    "boundary_ids": list(_collect_available_boundary_ids(resolver, geodesic_lines, deps)),
                     "boundary_count": None,
                     "blocked_count": None,
                     "total_points": None,
@@ -518,7 +470,7 @@ def compute_segment_ids(
             message = _diagnose_segment_failure(
                 seg_id,
                 adjacency,
-                locator,
+                resolver,
                 landmarks,
                 geodesic_lines,
                 deps,
@@ -570,7 +522,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -594,7 +546,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -619,7 +571,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -653,7 +605,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -685,7 +637,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -712,7 +664,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -742,7 +694,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -774,7 +726,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -810,7 +762,7 @@ def compute_segment_ids(
     )
     if error_message:
         return (
-            _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+            _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
             error_message,
             debug_points,
         )
@@ -818,7 +770,7 @@ def compute_segment_ids(
         segments[9] = seg9
 
     return (
-        _build_segment_ids(surface, segments, adjacency, locator, landmarks, geodesic_lines),
+        _build_segment_ids(surface, segments, adjacency, resolver, landmarks, geodesic_lines),
         None,
         None,
     )
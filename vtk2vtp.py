@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+from vtkmodules.vtkIOLegacy import vtkPolyDataReader
+from vtkmodules.vtkIOXML import vtkXMLPolyDataWriter
+
+
+def convert(path: Path) -> Path:
+    reader = vtkPolyDataReader()
+    reader.SetFileName(str(path))
+    reader.ReadAllScalarsOn()
+    reader.ReadAllVectorsOn()
+    reader.ReadAllNormalsOn()
+    reader.ReadAllTensorsOn()
+    reader.ReadAllFieldsOn()
+    reader.Update()
+
+    output_path = path.with_suffix(".vtp")
+    writer = vtkXMLPolyDataWriter()
+    writer.SetFileName(str(output_path))
+    writer.SetInputData(reader.GetOutput())
+    writer.SetDataModeToAppended()
+    writer.EncodeAppendedDataOff()
+    writer.SetCompressorTypeToZLib()
+    writer.Write()
+    return output_path
+
+
+def main() -> None:
+    for arg in sys.argv[1:]:
+        print(convert(Path(arg)))
+
+
+if __name__ == "__main__":
+    main()